@@ -0,0 +1,55 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.utils.io_utils import excel_engine, read_excel, to_excel_stream
+
+SIZES = (50_000, 500_000)
+
+
+def synthetic_sales(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "fecha": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "producto": rng.choice(["PROD_A", "PROD_B", "PROD_C", "PROD_D"], rows),
+        "precio": rng.integers(100, 10_000, rows) / 100,
+        "ud_vendidas": rng.integers(1, 50, rows),
+    })
+
+
+def available_engines() -> list[str]:
+    engines = ["pandas", "openpyxl"]
+    if excel_engine("auto") == "calamine":
+        engines.append("calamine")
+    return engines
+
+
+def time_read(path: Path, engine: str, **kwargs) -> tuple[float, int]:
+    start = time.perf_counter()
+    df = read_excel(path, engine=engine, **kwargs)
+    return time.perf_counter() - start, len(df)
+
+
+def main(sizes: tuple[int, ...] = SIZES):
+    engines = available_engines()
+    print(f"engines: {', '.join(engines)} (auto -> {excel_engine('auto')})")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = Path(tmp) / f"sales_{rows}.xlsx"
+            to_excel_stream(synthetic_sales(rows), path)
+            print(f"\n{rows} rows, {path.stat().st_size / 1e6:.1f} MB")
+            cases = [("full", {}), ("usecols", {"usecols": ["producto", "precio"]}), ("nrows=1000", {"nrows": 1000})]
+            for label, kwargs in cases:
+                baseline = None
+                for engine in engines:
+                    elapsed, n = time_read(path, engine, **kwargs)
+                    baseline = baseline or elapsed
+                    print(f"{label:>10} {engine:>9}: {elapsed:7.2f}s  {n / elapsed:10.0f} rows/s  x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Excel reader throughput per engine")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(SIZES))
+    main(tuple(parser.parse_args().rows))
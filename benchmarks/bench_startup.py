@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from main import COMMANDS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_time(statement: str) -> tuple[int, list[tuple[int, str]]]:
+    # Runs `statement` under -X importtime and returns (total us, top modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative), name.rstrip()))
+    top_level = [(c, n) for c, n in rows if not n.startswith("  ")]
+    total = sum(c for c, _ in top_level)
+    return total, sorted(top_level, reverse=True)[:5]
+
+
+def main():
+    targets = {"main (CLI only)": "import main", "config": "import config"}
+    for name, (module, _) in COMMANDS.items():
+        targets[name] = f"import src.exercises.{module}"
+
+    print(f"{'target':<22}{'import ms':>10}  heaviest modules")
+    for label, statement in targets.items():
+        total, top = import_time(statement)
+        heaviest = ", ".join(f"{n.strip()} {c / 1000:.0f}ms" for c, n in top[:3])
+        print(f"{label:<22}{total / 1000:>10.1f}  {heaviest}")
+
+
+if __name__ == "__main__":
+    main()
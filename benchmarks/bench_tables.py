@@ -0,0 +1,26 @@
+import importlib.util
+import time
+from src.utils.table_utils import extract_tables
+from benchmarks.datagen import html_table
+
+ROWS = 100_000
+
+
+def main(rows: int = ROWS):
+    html = html_table(rows)
+    engines = ["bs4", "stream"]
+    if importlib.util.find_spec("lxml"):
+        engines.append("lxml")
+
+    print(f"{rows} rows, {len(html) / 1e6:.1f} MB of HTML")
+    baseline = None
+    for engine in engines:
+        start = time.perf_counter()
+        df = extract_tables(html, table_id="customers", engine=engine)[0]
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{engine:>7}: {elapsed:7.2f}s  {len(df) / elapsed:10.0f} rows/s  x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
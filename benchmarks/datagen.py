@@ -0,0 +1,132 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.utils.io_utils import to_excel_stream
+
+# Shapes follow the sample frames the exercises create when data is missing
+# (ensure_data / ensure_ventas, ensure_airtravel, ensure_master_if_missing,
+# ensure_samples_if_empty and FALLBACK_HTML), scaled up to `rows`
+PRODUCTS = ["A", "B", "C", "D", "E"]
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def sales(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "fecha": (pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(0, 90, rows), unit="D")).strftime("%Y-%m-%d"),
+        "producto": rng.choice(PRODUCTS, rows),
+        "precio": rng.integers(5, 20, rows),
+        "ud_vendidas": rng.integers(50, 150, rows),
+    })
+
+
+def sales_en(rows: int, seed: int = 0) -> pd.DataFrame:
+    return sales(rows, seed).rename(columns={
+        "fecha": "date", "producto": "product", "precio": "price", "ud_vendidas": "sold_units",
+    })
+
+
+def master(rows: int, seed: int = 0) -> pd.DataFrame:
+    df = sales(rows, seed)
+    df["origen"] = [f"ventas_{i % 2 + 1}" for i in range(rows)]
+    return df
+
+
+def airtravel(years: int = 3, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {"Month": MONTHS}
+    for y in range(1958, 1958 + years):
+        data[str(y)] = rng.integers(300, 520, len(MONTHS))
+    return pd.DataFrame(data)
+
+
+def html_table(rows: int) -> str:
+    body = "".join(
+        f"<tr><td>Company {i}</td><td>Contact {i % 997}</td><td>Country {i % 50}</td></tr>"
+        for i in range(rows)
+    )
+    return (
+        '<html><body><table id="customers">'
+        "<thead><tr><th>Company</th><th>Contact</th><th>Country</th></tr></thead>"
+        f"<tbody>{body}</tbody></table></body></html>"
+    )
+
+
+def multi_sheet_workbook(path: Path, rows: int, sheets: int = 4) -> Path:
+    # Sheets of unequal width, so the union has to align schemas
+    path.parent.mkdir(parents=True, exist_ok=True)
+    per_sheet = max(1, rows // sheets)
+    with pd.ExcelWriter(path) as writer:
+        for i in range(sheets):
+            df = sales_en(per_sheet, seed=i)
+            if i % 2:
+                df = df.drop(columns="date")
+            df.to_excel(writer, sheet_name=f"S{i + 1}", index=False)
+    return path
+
+
+def _seed_ventas(data_dir: Path, rows: int) -> int:
+    path = data_dir / "raw" / "ventas.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sales(rows)[["producto", "precio", "ud_vendidas"]].to_csv(path, index=False)
+    return rows
+
+
+def _seed_airtravel(data_dir: Path, rows: int) -> int:
+    path = data_dir / "raw" / "airtravel.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    airtravel().to_csv(path, index=False)
+    return len(MONTHS)
+
+
+def _seed_daily(data_dir: Path, rows: int) -> int:
+    to_excel_stream(sales(rows), data_dir / "raw" / "ventas_diarias_20250901.xlsx")
+    return rows
+
+
+def _seed_raw_workbooks(data_dir: Path, rows: int, files: int = 4) -> int:
+    for i in range(files):
+        to_excel_stream(sales_en(rows // files, seed=i), data_dir / "raw" / f"sales_{i + 1}.xlsx")
+    return rows // files * files
+
+
+def _seed_latest_workbook(data_dir: Path, rows: int) -> int:
+    to_excel_stream(sales_en(rows), data_dir / "raw" / "sales_1.xlsx")
+    return rows
+
+
+def _seed_master(data_dir: Path, rows: int) -> int:
+    # ex09 reads the master ex08 writes, which has the English headers
+    to_excel_stream(sales_en(rows), data_dir / "processed" / "master.xlsx")
+    return rows
+
+
+def _seed_multi_sheet(data_dir: Path, rows: int) -> int:
+    multi_sheet_workbook(data_dir / "raw" / "book.xlsx", rows)
+    return rows
+
+
+def _seed_nothing(data_dir: Path, rows: int) -> int:
+    return 0
+
+
+def _seed_fixed_sample(data_dir: Path, rows: int) -> int:
+    # ex01 always writes its own 5-row sample
+    return 5
+
+
+# exercise -> seeder(data_dir, rows) returning the number of input rows
+SEEDERS = {
+    "ex01": _seed_fixed_sample,
+    "ex02": _seed_ventas,
+    "ex03": _seed_nothing,
+    "ex04": _seed_nothing,
+    "ex05": _seed_airtravel,
+    "ex06": _seed_daily,
+    "ex07": _seed_ventas,
+    "ex08": _seed_raw_workbooks,
+    "ex09": _seed_master,
+    "ex10": _seed_latest_workbook,
+    "ex11": _seed_nothing,
+    "ex12": _seed_multi_sheet,
+}
@@ -0,0 +1,210 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from benchmarks import datagen
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+HISTORY_PATH = RESULTS_DIR / "history.jsonl"
+BASELINE_PATH = RESULTS_DIR / "baseline.json"
+ROWS = 20_000
+TOLERANCE = 0.25
+# Need the network; only run with --network
+NETWORK = {"ex03", "ex04", "ex11"}
+
+
+def _seed_frame(data_dir: Path, rows: int) -> int:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    datagen.master(rows).to_parquet(data_dir / "input.parquet", index=False)
+    return rows
+
+
+def _seed_html(data_dir: Path, rows: int) -> int:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (data_dir / "table.html").write_text(datagen.html_table(rows), encoding="utf-8")
+    return rows
+
+
+def _bench_read_csv(data_dir: Path) -> None:
+    from src.utils.io_utils import read_csv_safe
+    read_csv_safe(data_dir / "raw" / "ventas.csv", use_cache=False)
+
+
+def _bench_read_excel(data_dir: Path) -> None:
+    from src.utils.io_utils import read_excel_safe
+    read_excel_safe(data_dir / "raw" / "sales_1.xlsx", use_cache=False)
+
+
+def _bench_to_excel(data_dir: Path, streaming: bool) -> None:
+    from src.utils.io_utils import to_excel_safe
+    to_excel_safe(pd.read_parquet(data_dir / "input.parquet"), data_dir / "out.xlsx", streaming=streaming)
+
+
+def _bench_write_partitioned(data_dir: Path) -> None:
+    from src.utils.io_utils import write_partitioned
+    write_partitioned(pd.read_parquet(data_dir / "input.parquet"), "producto", data_dir / "parts",
+                      name=lambda v: f"product_{v}")
+
+
+def _bench_union_sheets(data_dir: Path) -> None:
+    from src.utils.io_utils import union_sheets, to_excel_stream
+    to_excel_stream(union_sheets(data_dir / "raw" / "book.xlsx"), data_dir / "union.xlsx", index=True)
+
+
+def _bench_extract_tables(data_dir: Path) -> None:
+    from src.utils.table_utils import extract_tables
+    extract_tables((data_dir / "table.html").read_text(encoding="utf-8"), table_id="customers")
+
+
+def _exercise(module: str):
+    def run(data_dir: Path) -> None:
+        importlib.import_module(f"src.exercises.{module}").main()
+    return run
+
+
+# name -> (seeder(data_dir, rows) -> input rows, runner(data_dir))
+BENCHMARKS = {
+    **{f"{m}.main": (seed, _exercise(m)) for m, seed in datagen.SEEDERS.items()},
+    "io.read_csv_safe": (datagen.SEEDERS["ex02"], _bench_read_csv),
+    "io.read_excel_safe": (datagen.SEEDERS["ex10"], _bench_read_excel),
+    "io.to_excel_safe": (_seed_frame, lambda d: _bench_to_excel(d, streaming=False)),
+    "io.to_excel_stream": (_seed_frame, lambda d: _bench_to_excel(d, streaming=True)),
+    "io.write_partitioned": (_seed_frame, _bench_write_partitioned),
+    "io.union_sheets": (datagen.SEEDERS["ex12"], _bench_union_sheets),
+    "tables.extract_tables": (_seed_html, _bench_extract_tables),
+}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def child(action: str, name: str, rows: int) -> None:
+    # Runs inside a fresh interpreter whose DATA_DIR points at a scratch dir
+    data_dir = Path(os.environ["DATA_DIR"])
+    seeder, runner = BENCHMARKS[name]
+    if action == "seed":
+        print(json.dumps({"rows": seeder(data_dir, rows)}))
+        return
+    start = time.perf_counter()
+    runner(data_dir)
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def _spawn(action: str, name: str, rows: int, env: dict) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.harness", "--child", action, name, "--rows", str(rows)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(name: str, rows: int, repeat: int = 1) -> dict:
+    # Best of `repeat` runs, each on freshly seeded data in its own process
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Logs (app.log, perf.jsonl) go to the scratch dir too, never to the repo's logs/
+            env = {**os.environ, "DATA_DIR": tmp, "LOG_DIR": str(Path(tmp) / "logs"), "LOG_LEVEL": "WARNING",
+                   "PARSE_CACHE": "0", "HTTP_CACHE": "0"}
+            seeded = _spawn("seed", name, rows, env)
+            result = _spawn("run", name, rows, env)
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    best["rows"] = seeded["rows"]
+    best["rows_per_s"] = seeded["rows"] / best["seconds"] if best["seconds"] else 0.0
+    return best
+
+
+def _git_rev() -> str | None:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    # A benchmark regresses when it is slower or heavier than the baseline by more than `tolerance`
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "error" in r or "error" in base:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if r[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {base[metric]:.2f} -> {r[metric]:.2f}")
+    return regressions
+
+
+def main(only: list[str] | None = None, rows: int = ROWS, repeat: int = 1, network: bool = False,
+         save_baseline: bool = False, tolerance: float = TOLERANCE) -> int:
+    names = [n for n in BENCHMARKS if not only or any(n.startswith(o) for o in only)]
+    if not network:
+        names = [n for n in names if n.split(".")[0] not in NETWORK]
+
+    results = {}
+    print(f"{'benchmark':<24}{'seconds':>9}{'peak MB':>9}{'rows/s':>12}")
+    for name in names:
+        try:
+            r = results[name] = measure(name, rows, repeat)
+            print(f"{name:<24}{r['seconds']:>9.2f}{r['peak_rss_mb']:>9.0f}{r['rows_per_s']:>12.0f}")
+        except Exception as e:
+            results[name] = {"error": str(e)}
+            print(f"{name:<24}  failed: {e}")
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "rows": rows,
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+    if save_baseline:
+        BASELINE_PATH.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+    if not BASELINE_PATH.exists():
+        print("No baseline stored; run with --save-baseline to create one")
+        return 0
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    if baseline.get("rows") != rows:
+        print(f"Baseline was recorded at {baseline.get('rows')} rows; comparison skipped")
+        return 0
+    regressions = compare(results, baseline, tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions against baseline {baseline.get('git_rev')} ({baseline.get('timestamp')})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every pipeline and io_utils function on synthetic data")
+    parser.add_argument("only", nargs="*", help="Run benchmarks whose name starts with these prefixes")
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the best of N runs")
+    parser.add_argument("--network", action="store_true", help="Include exercises that need the network")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--child", nargs=2, metavar=("ACTION", "NAME"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child, args.rows)
+    else:
+        sys.exit(main(args.only, args.rows, args.repeat, args.network, args.save_baseline, args.tolerance))
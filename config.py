@@ -1,31 +1,195 @@
 from pathlib import Path
 import logging
 import os
+import threading
 
 BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-RAW_DIR = DATA_DIR / "raw"
-PROCESSED_DIR = DATA_DIR / "processed"
-LOG_DIR = BASE_DIR / "logs"
-LOG_DIR.mkdir(exist_ok=True)
-RAW_DIR.mkdir(parents=True, exist_ok=True)
-PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-
-# Log
+DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data"))
+
+# Created on first access (see __getattr__), not at import time
+_LAZY_DIRS = {
+    "RAW_DIR": DATA_DIR / "raw",
+    "PROCESSED_DIR": DATA_DIR / "processed",
+    "LOG_DIR": Path(os.getenv("LOG_DIR", BASE_DIR / "logs")),
+}
+
+# Log: app.log rotates at LOG_MAX_MB keeping LOG_BACKUPS old files. With
+# LOG_SAMPLE_EVERY=N, INFO/DEBUG lines from one call site after the first are
+# kept only one in N (warnings and errors are never sampled)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-LOG_FILE = LOG_DIR / "app.log"
-
-# Logger
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.INFO),
-    format= "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+LOG_FILE = _LAZY_DIRS["LOG_DIR"] / "app.log"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_MB", "10")) * 1024 * 1024
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 
+# Logger: handlers are attached by setup_logging() on the first record
 logger = logging.getLogger("python_lab")
+logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+# Perf records (JSON lines, see perf_utils) share the queue and listener but
+# only ever reach logs/perf.jsonl, and are never sampled
+PERF_LOGGER = "python_lab.perf"
+_logging_ready = False
+_logging_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+
+
+class _SampleFilter(logging.Filter):
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self.seen = {}
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        n = self.seen[key] = self.seen.get(key, 0) + 1
+        return n % self.every == 1
+
+
+def _stop_listener() -> None:
+    # Forked workers inherit the atexit hook; only the owner drains the queue
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+
+
+def setup_logging() -> None:
+    # Records are formatted by the caller and put on a queue; a listener
+    # thread does the disk/console I/O. The main process uses a
+    # multiprocessing queue, so forked pool workers (which inherit the
+    # QueueHandler) send their records to the same listener and file.
+    global _logging_ready, _listener, _listener_pid
+    with _logging_lock:
+        if _logging_ready:
+            return
+        _logging_ready = True
+        import atexit
+        import multiprocessing
+        import queue
+        from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        if multiprocessing.parent_process() is None:
+            file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                               encoding="utf-8")
+            log_queue = multiprocessing.Queue()
+        else:
+            # Spawned child without the parent's queue: append without rotating,
+            # so only the main process ever renames app.log
+            file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+            log_queue = queue.SimpleQueue()
+        formatter = logging.Formatter(LOG_FORMAT)
+        targets = [file_handler, logging.StreamHandler()]
+        for h in targets:
+            h.setFormatter(formatter)
+            h.addFilter(lambda record: record.name != PERF_LOGGER)
+        perf_handler = logging.FileHandler(PERF_LOG_FILE, encoding="utf-8", delay=True)
+        perf_handler.setFormatter(logging.Formatter("%(message)s"))
+        perf_handler.addFilter(logging.Filter(PERF_LOGGER))
+        targets.append(perf_handler)
+
+        handler = QueueHandler(log_queue)
+        if LOG_SAMPLE_EVERY > 1:
+            handler.addFilter(_SampleFilter(LOG_SAMPLE_EVERY))
+        root = logging.getLogger()
+        root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        root.addHandler(handler)
+        perf = logging.getLogger(PERF_LOGGER)
+        perf.propagate = False
+        perf.setLevel(logging.INFO)
+        perf.addHandler(QueueHandler(log_queue))
+
+        _listener = QueueListener(log_queue, *targets, respect_handler_level=True)
+        _listener_pid = os.getpid()
+        _listener.start()
+        atexit.register(_stop_listener)
+
+
+class _DeferredSetup(logging.Handler):
+    # Sets up the real handlers and lets the record propagate to them
+    def handle(self, record) -> bool:
+        logger.removeHandler(self)
+        setup_logging()
+        return True
+
+    def emit(self, record) -> None:
+        pass
+
+
+logger.addHandler(_DeferredSetup())
+
+
+def __getattr__(name: str):
+    if name in _LAZY_DIRS:
+        path = _LAZY_DIRS[name]
+        path.mkdir(parents=True, exist_ok=True)
+        globals()[name] = path
+        return path
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 DEFAULT_CSV_ENCODING = "utf-8"
 
+# Parallel ingestion: worker count and pool type ("process" or "thread")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))
+INGEST_POOL = os.getenv("INGEST_POOL", "process").lower()
+
+# Excel reader: "auto" (calamine when installed, else openpyxl read-only), "calamine",
+# "openpyxl" (read-only reader with usecols/nrows pushdown) or "pandas" (stock read_excel)
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "auto").lower()
+
+# Sheets of one workbook read concurrently by the ex12 union (1 = one at a time)
+SHEET_WORKERS = int(os.getenv("SHEET_WORKERS", "1"))
+
+# Partitioned exports (ex09): worker count and file format ("xlsx", "csv" or "parquet")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", os.cpu_count() or 1))
+SPLIT_FORMAT = os.getenv("SPLIT_FORMAT", "xlsx").lower()
+
+# Batch downloads
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "8"))
+DOWNLOAD_PER_HOST = int(os.getenv("DOWNLOAD_PER_HOST", "4"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+
+# HTTP response cache and HTML parser ("auto" picks lxml when installed)
+HTTP_CACHE = os.getenv("HTTP_CACHE", "1") != "0"
+HTTP_CACHE_DIR = DATA_DIR / "http_cache"
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "3600"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024
+HTML_PARSER = os.getenv("HTML_PARSER", "auto").lower()
+
+# Async scraping (ex04): parser processes and fetched pages allowed to wait for them
+SCRAPE_PARSE_WORKERS = int(os.getenv("SCRAPE_PARSE_WORKERS", os.cpu_count() or 1))
+SCRAPE_MAX_PENDING = int(os.getenv("SCRAPE_MAX_PENDING", "16"))
+
+# Batch plot rendering
+PLOT_WORKERS = int(os.getenv("PLOT_WORKERS", os.cpu_count() or 1))
+# Line charts longer than this are min/max decimated (0 disables it)
+PLOT_MAX_POINTS = int(os.getenv("PLOT_MAX_POINTS", "5000"))
+
+# Parse cache for raw inputs
+PARSE_CACHE = os.getenv("PARSE_CACHE", "1") != "0"
+CACHE_DIR = DATA_DIR / "cache"
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Pipeline DAG runner
+DAG_WORKERS = int(os.getenv("DAG_WORKERS", "4"))
+
+# Master backups retention: the last BACKUP_KEEP_LAST snapshots, plus the newest
+# snapshot of each of the last N days / M weeks
+BACKUP_KEEP_LAST = int(os.getenv("BACKUP_KEEP_LAST", "5"))
+BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", "7"))
+BACKUP_KEEP_WEEKLY = int(os.getenv("BACKUP_KEEP_WEEKLY", "4"))
+
+# Master storage: "parquet" (partitioned ledger) or "excel" (single workbook)
+MASTER_STORAGE = os.getenv("MASTER_STORAGE", "parquet").lower()
+
+# Performance records: one JSON line per instrumented call in logs/perf.jsonl.
+# PERF_PROFILE ("cprofile", "tracemalloc" or both, comma separated) also dumps
+# a profile per CLI run under logs/profiles
+PERF_LOG = os.getenv("PERF_LOG", "1") != "0"
+PERF_LOG_FILE = _LAZY_DIRS["LOG_DIR"] / "perf.jsonl"
+PERF_PROFILE = {p.strip() for p in os.getenv("PERF_PROFILE", "").lower().split(",") if p.strip()}
+PROFILE_DIR = _LAZY_DIRS["LOG_DIR"] / "profiles"
+
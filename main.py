@@ -0,0 +1,69 @@
+import argparse
+import importlib
+import sys
+
+# command -> (exercise module, help). Modules are imported only when their
+# command runs, so e.g. "plot-airtravel" never pays for requests or bs4.
+COMMANDS = {
+    "filter-sales": ("ex01", "Filter ventas.csv by price and compute importe"),
+    "zscore": ("ex02", "Price z-scores for ventas.csv"),
+    "download-airtravel": ("ex03", "Download airtravel.csv and export the top rows"),
+    "scrape-customers": ("ex04", "Scrape the customers HTML table"),
+    "plot-airtravel": ("ex05", "Line chart of travelers per month"),
+    "update-master": ("ex06", "Merge the daily Excel into the sales master"),
+    "plot-sales": ("ex07", "Price histogram and product count charts"),
+    "combine": ("ex08", "Combine every raw workbook into master.xlsx"),
+    "split-products": ("ex09", "Split master.xlsx into one file per product"),
+    "normalize": ("ex10", "Normalize headers of the latest raw workbook"),
+    "download-urls": ("ex11", "Download every URL listed in urls.txt"),
+    "union-sheets": ("ex12", "Union every sheet of the latest raw workbook"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python-lab", description="Run a data pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (module, help_text) in COMMANDS.items():
+        cmd = sub.add_parser(name, aliases=[module], help=help_text)
+        cmd.set_defaults(module=module)
+        if module == "ex04":
+            cmd.add_argument("--url", dest="urls", action="append", metavar="URL",
+                             help="Scrape these pages instead (repeatable); one workbook per URL")
+        if module == "ex06":
+            cmd.add_argument("--export", action="store_true", help="Also export the master to Excel")
+            cmd.add_argument("--restore", nargs="?", const="", metavar="AS_OF",
+                             help="Restore the ledger from the latest backup at or before AS_OF (ISO date/time)")
+
+    run = sub.add_parser("run", help="Run every pipeline as a DAG, skipping up-to-date steps")
+    run.set_defaults(module=None)
+    run.add_argument("only", nargs="*", help="Restrict the run to these steps (exNN)")
+    run.add_argument("--force", action="store_true", help="Ignore stored fingerprints")
+    run.add_argument("--workers", type=int, help="Steps run in parallel")
+
+    report = sub.add_parser("perf-report", help="Summarize the performance records in logs/perf.jsonl")
+    report.set_defaults(module="perf-report")
+    report.add_argument("--since", help="Only records at or after this ISO timestamp")
+    report.add_argument("--name", help="Only records whose name starts with this prefix")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    kwargs = {k: v for k, v in vars(args).items() if k not in ("command", "module") and v is not None}
+    if args.module is None:
+        from src import pipeline
+        results = pipeline.main(**kwargs)
+        return 1 if any(r["status"] == "failed" for r in results.values()) else 0
+    if args.module == "perf-report":
+        from src.utils.perf_utils import print_report
+        print_report(**kwargs)
+        return 0
+    from src.utils.perf_utils import profile_run
+    module = importlib.import_module(f"src.exercises.{args.module}")
+    with profile_run(args.module):
+        module.main(**kwargs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 from pathlib import Path
-import pandas as pd
 
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.io_utils import to_excel_safe
+from src.utils.perf_utils import timed
 
+@timed()
 def main():
+    import pandas as pd
+    from src.utils.pipeline_utils import read_chunks, apply_stages, filter_rows, assign, sink_excel
+
     sample = pd.DataFrame({
         "producto": ["A", "B", "C", "A", "B"],
         "precio": [10, 12, 9, 11, 13],
@@ -14,14 +17,14 @@ def main():
     sample.to_csv(csv_path, index=False)
     logger.info(f"CSV created in: {csv_path}")
 
-    df = pd.read_csv(csv_path)
-
-    df_filtrado = df[df["precio"] >= 11].copy()
-
-    df_filtrado["importe"] = df_filtrado["precio"] * df_filtrado["ud_vendidas"]
+    chunks = apply_stages(
+        read_chunks(csv_path),
+        filter_rows(lambda df: df["precio"] >= 11),
+        assign(importe=lambda df: df["precio"] * df["ud_vendidas"]),
+    )
 
     out_path = PROCESSED_DIR / "ventas_filtrado.xlsx"
-    to_excel_safe(df_filtrado, out_path)
+    sink_excel(chunks, out_path)
     logger.info(f"File saved in {out_path}")
 
 
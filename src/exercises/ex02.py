@@ -1,14 +1,16 @@
+from __future__ import annotations
 from pathlib import Path
-import pandas as pd
-import numpy as np
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.io_utils import to_excel_safe
+from src.utils.perf_utils import timed
 
 
 def ensure_data(csv_path: Path) -> pd.DataFrame:
+    import pandas as pd
+    from src.utils.io_utils import read_csv_safe
+
     if csv_path.exists():
         logger.info(f"Using data {csv_path}")
-        return pd.read_csv(csv_path)
+        return read_csv_safe(csv_path)
 
     logger.warning(f"{csv_path} not found. Creating example")
     df = pd.DataFrame({
@@ -20,24 +22,30 @@ def ensure_data(csv_path: Path) -> pd.DataFrame:
     return df
 
 
+@timed()
 def main():
-    csv_path = RAW_DIR / "ventas.csv"
-    df = ensure_data(csv_path)
-
-    precios = df["precio"].to_numpy(dtype=float)
+    import numpy as np
+    import pandas as pd
+    from src.utils.pipeline_utils import read_chunks, apply_stages, column_stats, sink_excel
 
-    media = np.mean(precios)
-    sigma = np.std(precios, ddof=0)
-
-    z = (precios - media) / sigma if sigma != 0 else np.zeros_like(precios)
+    csv_path = RAW_DIR / "ventas.csv"
+    if not csv_path.exists():
+        ensure_data(csv_path)
 
-    out = df.copy()
-    out["zscore_precio"] = z
+    # Two passes over the CSV: online mean/std first, then z-scores per chunk
+    stats = column_stats(csv_path, "precio")
+    media = stats.mean
+    sigma = stats.std(ddof=0)
 
-    out["precio_categoria"] = np.where(out["zscore_precio"] >= 0, ">= media", "< media")
+    def add_zscore(chunk: pd.DataFrame) -> pd.DataFrame:
+        precios = chunk["precio"].to_numpy(dtype=float)
+        z = (precios - media) / sigma if sigma != 0 else np.zeros_like(precios)
+        out = chunk.assign(zscore_precio=z)
+        out["precio_categoria"] = np.where(out["zscore_precio"] >= 0, ">= media", "< media")
+        return out
 
     out_path = PROCESSED_DIR / "valores_zscore.xlsx"
-    to_excel_safe(out, out_path)
+    sink_excel(apply_stages(read_chunks(csv_path), add_zscore), out_path)
     logger.info(f"media={media:.2f} | sigma={sigma:.2f} -> {out_path}")
 
 
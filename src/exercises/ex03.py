@@ -1,17 +1,20 @@
 from pathlib import Path
-import pandas as pd
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.web_utils import download_file
-from src.utils.io_utils import to_excel_safe
+from src.utils.perf_utils import timed
 
 CSV_URL = "https://people.sc.fsu.edu/~jburkardt/data/csv/airtravel.csv"
 
 
+@timed()
 def main():
+    import pandas as pd
+    from src.utils.web_utils import fetch_dataframe
+    from src.utils.io_utils import to_excel_safe
+
     dest = RAW_DIR / "airtravel.csv"
     try:
-        download_file(CSV_URL, dest)
-        df = pd.read_csv(dest)
+        # Parsed from the response in one pass; the raw CSV is still archived in dest
+        df = fetch_dataframe(CSV_URL, tee=dest)
     except Exception as e:
         logger.exception(f"File not found {e}. Creating example")
         df = pd.DataFrame({
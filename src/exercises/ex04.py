@@ -1,8 +1,9 @@
+from __future__ import annotations
 from pathlib import Path
-import pandas as pd
+import re
+from urllib.parse import urlparse
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.web_utils import get_soup
-from bs4 import BeautifulSoup
+from src.utils.perf_utils import timed
 
 URL = "https://www.w3schools.com/html/html_tables.asp"
 
@@ -22,54 +23,58 @@ FALLBACK_HTML = """
 
 
 def parse_table_to_df(table_tag) -> pd.DataFrame:
-    rows = table_tag.find_all("tr")
-    if not rows:
-        return pd.DataFrame()
-
-    header_cells = rows[0].find_all(["th", "td"])
-    headers = [c.get_text(strip=True) for c in header_cells]
-    if not headers:
-        headers = [f"col_{i}" for i in range(len(header_cells))]
-
-    data = []
-    for tr in rows[1:]:
-        cells = tr.find_all(["td", "th"])
-        if not cells:
-            continue
-        values = [c.get_text(strip=True) for c in cells]
-        if len(values) < len(headers):
-            values += [None] * (len(headers) - len(values))
-        elif len(values) > len(headers):
-            values = values[:len(headers)]
-        data.append(values)
-
-    return pd.DataFrame(data, columns=headers)
+    from src.utils.table_utils import bs4_table_to_df
+
+    return bs4_table_to_df(table_tag)
+
+
+def _save_fallback() -> None:
+    fallback_path = RAW_DIR / "customers_fallback.html"
+    fallback_path.write_text(FALLBACK_HTML, encoding="utf-8")
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    return df.map(lambda x: x.strip() if isinstance(x, str) else x)
 
 
 def scrap_customers_table() -> pd.DataFrame:
-    try:
-        soup = get_soup(URL)
-        table = soup.find("table", id="customers") or soup.find("table")
-        if table in None:
-            raise ValueError("No table found")
-        df = parse_table_to_df(table)
-        if df.empty:
-            raise ValueError("No valid rows in table")
-        logger.info(f"Table with {len(df)} rows")
-        return df
-    except Exception as e:
-        logger.warning(f"Fail scrapping {e}")
-        fallback_path = RAW_DIR / "customers_fallback.html"
-        fallback_path.write_text(FALLBACK_HTML, encoding="utf-8")
-        soup_fb = BeautifulSoup(FALLBACK_HTML, "html.parser")
-        table_fb = soup_fb.find("table")
-        df_fb = parse_table_to_df(table_fb)
-        return df_fb
-
-
-def main():
-    df = scrap_customers_table()
-    df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+    from src.utils.scrape_utils import scrape_many
+
+    (_, df, source), = scrape_many([URL], table_id="customers", fallback_html=FALLBACK_HTML)
+    if source == "fallback":
+        _save_fallback()
+    if isinstance(df, Exception):
+        raise df
+    return df
+
+
+def scrape_customers_tables(urls: list[str], out_dir: Path) -> list[tuple[str, pd.DataFrame | Exception, str | None]]:
+    # Each table is written as soon as it is parsed, one workbook per URL
+    from src.utils.scrape_utils import scrape_many
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    hosts = [re.sub(r"[^\w.-]", "_", urlparse(url).netloc) or "page" for url in urls]
+    names = {url: f"{i:03d}_{host}.xlsx" for i, (url, host) in enumerate(zip(urls, hosts), start=1)}
+
+    def sink(url: str, df: pd.DataFrame) -> None:
+        _clean(df).to_excel(out_dir / names[url], index=False)
+
+    results = scrape_many(urls, table_id="customers", sink=sink, fallback_html=FALLBACK_HTML)
+    if any(source == "fallback" for _, _, source in results):
+        _save_fallback()
+    return results
+
+
+@timed()
+def main(urls: list[str] | None = None):
+    if urls:
+        out_dir = PROCESSED_DIR / "customers_from_html"
+        results = scrape_customers_tables(urls, out_dir)
+        failed = sum(isinstance(df, Exception) for _, df, _ in results)
+        logger.info(f"Exporting {len(results) - failed} tables in: {out_dir} ({failed} failed)")
+        return
+
+    df = _clean(scrap_customers_table())
 
     out_path = PROCESSED_DIR / "customers_from_html.xlsx"
     df.to_excel(out_path, index=False)
@@ -77,4 +82,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
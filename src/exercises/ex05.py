@@ -1,13 +1,16 @@
+from __future__ import annotations
 from pathlib import Path
-import pandas as pd
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.plot_utils import save_lineplot
+from src.utils.perf_utils import timed
 
 
 def ensure_airtravel(csv_path: Path) -> pd.DataFrame:
+    import pandas as pd
+    from src.utils.io_utils import read_csv_safe
+
     if csv_path.exists():
         logger.info(f"Usando datos existentes: {csv_path}")
-        return pd.read_csv(csv_path)
+        return read_csv_safe(csv_path)
     logger.warning(f"No se encontró {csv_path}. Creando datos de ejemplo.")
     df = pd.DataFrame({
         "Month": ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"],
@@ -25,7 +28,11 @@ def month_to_number(month_str: str) -> int:
     return mapping.get(month_str.strip().upper(), None)
 
 
+@timed()
 def main():
+    import pandas as pd
+    from src.utils.plot_utils import save_lineplot
+
     csv_path = RAW_DIR / "airtravel.csv"
     df = ensure_airtravel(csv_path)
 
@@ -1,12 +1,17 @@
+from __future__ import annotations
 from pathlib import Path
 from datetime import datetime, date
-import pandas as pd
 
-from config import RAW_DIR, PROCESSED_DIR, logger
+from config import (RAW_DIR, PROCESSED_DIR, MASTER_STORAGE, BACKUP_KEEP_LAST, BACKUP_KEEP_DAILY,
+                    BACKUP_KEEP_WEEKLY, logger)
+from src.utils.backup_utils import snapshot, prune, prune_files, restore
+from src.utils.perf_utils import timed
 
 DEDUP_KEYS = ["fecha", "producto"]
 MASTER_PATH = PROCESSED_DIR / "maestro_ventas.xlsx"
+LEDGER_DIR = PROCESSED_DIR / "maestro_ventas"
 BACKUP_DIR = PROCESSED_DIR / "backups"
+LEDGER_BACKUP_DIR = BACKUP_DIR / "ledger"
 
 
 def _find_daily_excel(raw_dir: Path) -> Path | None:
@@ -15,6 +20,8 @@ def _find_daily_excel(raw_dir: Path) -> Path | None:
 
 
 def _create_sample_daily_excel(dest: Path) -> Path:
+    import pandas as pd
+
     today = date.today().isoformat()
     df = pd.DataFrame({
         "fecha": [today, today, today],
@@ -29,36 +36,14 @@ def _create_sample_daily_excel(dest: Path) -> Path:
 
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    rename_map = {}
-    for col in df.columns:
-        lc = col.strip().lower()
-        if lc in {"fecha", "date"}:
-            rename_map[col] = "fecha"
-        elif lc in {"producto", "product"}:
-            rename_map[col] = "producto"
-        elif lc in {"precio", "price"}:
-            rename_map[col] = "precio"
-        elif lc in {"ud_vendidas", "unidades", "qty", "cantidad"}:
-            rename_map[col] = "ud_vendidas"
-
-    df = df.rename(columns=rename_map)
-
-    for required in ["producto", "precio", "ud_vendidas"]:
-        if required not in df.columns:
-            raise ValueError(f"Falta columna obligatoria en el diario: '{required}'")
-
-    if "fecha" not in df.columns:
-        df["fecha"] = date.today().isoformat()
+    from src.utils.schema_utils import normalize, SALES_ES
 
-    df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce").dt.date
-    df["precio"] = pd.to_numeric(df["precio"], errors="coerce")
-    df["ud_vendidas"] = pd.to_numeric(df["ud_vendidas"], errors="coerce")
+    try:
+        df = normalize(df, SALES_ES)
+    except ValueError as e:
+        raise ValueError(f"Falta columna obligatoria en el diario: {e}") from e
 
-    if "producto" in df.columns:
-        df["producto"] = df["producto"].astype(str).str.strip().str.upper()
-
-    df = df.dropna(subset=["fecha", "producto"])
-    return df[["fecha", "producto", "precio", "ud_vendidas"]].copy()
+    return df.dropna(subset=["fecha", "producto"])
 
 
 def _backup_master(master_path: Path) -> None:
@@ -69,21 +54,44 @@ def _backup_master(master_path: Path) -> None:
     bkp = BACKUP_DIR / f"{master_path.stem}_{ts}{master_path.suffix}"
     master_path.replace(bkp)
     logger.info(f"Backup del maestro creado en: {bkp}")
+    prune_files(sorted(BACKUP_DIR.glob(f"{master_path.stem}_*{master_path.suffix}")),
+                BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY, BACKUP_KEEP_LAST)
+
+
+def _backup_ledger() -> None:
+    if snapshot(LEDGER_DIR, LEDGER_BACKUP_DIR) is not None:
+        prune(LEDGER_BACKUP_DIR, BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY, BACKUP_KEEP_LAST)
 
 
-def main():
+def restore_master(as_of: str | None = None) -> Path:
+    when = datetime.fromisoformat(as_of) if as_of else None
+    return restore(LEDGER_BACKUP_DIR, LEDGER_DIR, when)
+
+
+def _load_daily() -> pd.DataFrame:
+    import pandas as pd
+    from src.utils.io_utils import read_excel_safe
+    from src.utils.dtype_utils import optimize_with_report
+
     daily = _find_daily_excel(RAW_DIR)
     if daily is None:
         daily = RAW_DIR / f"ventas_diarias_{date.today().strftime('%Y%m%d')}.xlsx"
         daily = _create_sample_daily_excel(daily)
     logger.info(f"Usando Excel diario: {daily}")
 
-    df_day = pd.read_excel(daily)
+    df_day = read_excel_safe(daily)
     df_day = _normalize_columns(df_day)
-    df_day["ingestion_ts"] = datetime.now().isoformat(timespec="seconds")
+    df_day["ingestion_ts"] = pd.Timestamp(datetime.now().replace(microsecond=0))
+    return optimize_with_report(df_day, "daily")
+
+
+def _update_excel_master(df_day: pd.DataFrame) -> None:
+    import pandas as pd
+    from src.utils.io_utils import read_excel
+    from src.utils.dtype_utils import optimize_with_report
 
     if MASTER_PATH.exists():
-        df_master = pd.read_excel(MASTER_PATH)
+        df_master = read_excel(MASTER_PATH)
         logger.info(f"Maestro existente cargado: {MASTER_PATH} ({len(df_master)} filas)")
     else:
         df_master = pd.DataFrame(columns=["fecha", "producto", "precio", "ud_vendidas", "ingestion_ts"])
@@ -91,7 +99,7 @@ def main():
 
     combined = pd.concat([df_master, df_day], ignore_index=True)
 
-    combined["fecha"] = pd.to_datetime(combined["fecha"], errors="coerce").dt.date
+    combined["fecha"] = pd.to_datetime(combined["fecha"], errors="coerce")
     combined["ingestion_ts"] = pd.to_datetime(combined["ingestion_ts"], errors="coerce")
 
     combined = (
@@ -101,11 +109,63 @@ def main():
         .reset_index(drop=True)
     )
 
+    combined = optimize_with_report(combined, "master")
+
     _backup_master(MASTER_PATH)
     MASTER_PATH.parent.mkdir(parents=True, exist_ok=True)
     combined.to_excel(MASTER_PATH, index=False)
     logger.info(f"Maestro actualizado: {MASTER_PATH} ({len(combined)} filas)")
 
 
+def _seed_ledger_from_excel() -> None:
+    import pandas as pd
+    from src.utils.io_utils import read_excel
+    from src.utils.ledger_utils import upsert_partitions, list_partitions
+
+    if list_partitions(LEDGER_DIR) or not MASTER_PATH.exists():
+        return
+    df_master = read_excel(MASTER_PATH)
+    df_master["fecha"] = pd.to_datetime(df_master["fecha"], errors="coerce")
+    df_master["ingestion_ts"] = pd.to_datetime(df_master["ingestion_ts"], errors="coerce")
+    df_master = df_master.dropna(subset=DEDUP_KEYS)
+    upsert_partitions(LEDGER_DIR, df_master, DEDUP_KEYS, order_col="ingestion_ts")
+    logger.info(f"Ledger inicializado desde {MASTER_PATH} ({len(df_master)} filas)")
+
+
+def _update_ledger(df_day: pd.DataFrame) -> None:
+    from src.utils.ledger_utils import upsert_partitions
+
+    _seed_ledger_from_excel()
+    _backup_ledger()
+    stats = upsert_partitions(LEDGER_DIR, df_day, DEDUP_KEYS, order_col="ingestion_ts")
+    logger.info(
+        f"Ledger actualizado: {LEDGER_DIR} ({stats['rows']} filas) | "
+        f"insertadas={stats['inserted']} actualizadas={stats['updated']} sin cambios={stats['unchanged']}"
+    )
+
+
+def export_master_excel(dest: Path = MASTER_PATH) -> Path:
+    from src.utils.ledger_utils import export_excel
+
+    return export_excel(LEDGER_DIR, dest, sort_by=DEDUP_KEYS)
+
+
+@timed()
+def main(export: bool = False, restore: str | None = None):
+    if restore is not None:
+        restore_master(restore or None)
+        return
+
+    df_day = _load_daily()
+
+    if MASTER_STORAGE == "excel":
+        _update_excel_master(df_day)
+        return
+
+    _update_ledger(df_day)
+    if export:
+        export_master_excel()
+
+
 if __name__ == "__main__":
     main()
@@ -1,15 +1,17 @@
+from __future__ import annotations
 from pathlib import Path
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from config import RAW_DIR, PROCESSED_DIR, logger
+from src.utils.perf_utils import timed
 
 
 def ensure_ventas(csv_path: Path) -> pd.DataFrame:
+    import pandas as pd
+    from src.utils.io_utils import read_csv_safe
+
     if csv_path.exists():
         logger.info(f"Usando datos existentes: {csv_path}")
-        return pd.read_csv(csv_path)
+        return read_csv_safe(csv_path)
 
     logger.warning(f"No se encontró {csv_path}. Creando datos de ejemplo.")
     df = pd.DataFrame({
@@ -21,31 +23,26 @@ def ensure_ventas(csv_path: Path) -> pd.DataFrame:
     return df
 
 
+@timed()
 def main():
+    from src.utils.plot_utils import PlotSpec, render_batch
+
     csv_path = RAW_DIR / "ventas.csv"
     df = ensure_ventas(csv_path)
 
-    ax1 = sns.histplot(data=df, x="precio", bins=10)
-    ax1.set_title("Distribución de precios")
-    ax1.set_xlabel("Precio")
-    ax1.set_ylabel("Frecuencia")
     out_hist = PROCESSED_DIR / "precio_histograma.png"
-    ax1.figure.tight_layout()
-    out_hist.parent.mkdir(parents=True, exist_ok=True)
-    ax1.figure.savefig(out_hist, dpi=150)
-    plt.close(ax1.figure)
-    logger.info(f"Histograma guardado en: {out_hist}")
-
-    ax2 = sns.countplot(data=df, x="producto")
-    ax2.set_title("Número de registros por producto")
-    ax2.set_xlabel("Producto")
-    ax2.set_ylabel("Conteo")
     out_count = PROCESSED_DIR / "productos_conteo.png"
-    ax2.figure.tight_layout()
-    ax2.figure.savefig(out_count, dpi=150)
-    plt.close(ax2.figure)
-    logger.info(f"Conteo guardado en: {out_count}")
-
+    specs = [
+        PlotSpec("hist", out_hist, data=df, x="precio", options={"bins": 10},
+                 title="Distribución de precios", xlabel="Precio", ylabel="Frecuencia"),
+        PlotSpec("count", out_count, data=df, x="producto",
+                 title="Número de registros por producto", xlabel="Producto", ylabel="Conteo"),
+    ]
+    results = dict(render_batch(specs))
+    if not isinstance(results[out_hist], Exception):
+        logger.info(f"Histograma guardado en: {out_hist}")
+    if not isinstance(results[out_count], Exception):
+        logger.info(f"Conteo guardado en: {out_count}")
 
 if __name__ == "__main__":
     main()
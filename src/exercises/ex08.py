@@ -1,11 +1,12 @@
 from pathlib import Path
-import pandas as pd
 from datetime import date
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.io_utils import to_excel_safe
+from src.utils.perf_utils import timed
 
 
 def ensure_samples_if_empty(raw_dir: Path) -> None:
+    import pandas as pd
+
     files = list(raw_dir.glob("*.xlsx"))
     if files:
         return
@@ -23,7 +24,12 @@ def ensure_samples_if_empty(raw_dir: Path) -> None:
     df2.to_excel(raw_dir / "sales_2.xlsx", index=False)
 
 
+@timed()
 def main():
+    import pandas as pd
+    from src.utils.io_utils import to_excel_safe, read_excel_many
+    from src.utils.dtype_utils import optimize_with_report
+
     ensure_samples_if_empty(RAW_DIR)
     files = sorted(RAW_DIR.glob("*.xlsx"))
     if not files:
@@ -31,21 +37,20 @@ def main():
         return
     logger.info(f"{len(files)} files found")
     frames = []
-    for f in files:
-        try:
-            df = pd.read_excel(f)
-            df["origin"] = f.stem
-            frames.append(df)
-        except Exception as e:
-            logger.exception(f"Error reading {f}: {e}")
+    for f, result in read_excel_many(files):
+        if isinstance(result, Exception):
+            logger.error(f"Error reading {f}: {result}", exc_info=result)
+            continue
+        result["origin"] = f.stem
+        frames.append(result)
 
     if not frames:
         logger.error("Impossible to read files")
         return
 
-    combo = pd.concat(frames, ignore_index=True)
+    combo = optimize_with_report(pd.concat(frames, ignore_index=True), "master")
     out_path = PROCESSED_DIR / "master.xlsx"
-    to_excel_safe(combo, out_path, index=False)
+    to_excel_safe(combo, out_path, index=False, streaming=True)
     logger.info(f"File generated: {out_path} ({len(combo)})")
 
 
@@ -1,13 +1,14 @@
 from pathlib import Path
-import pandas as pd
-from config import PROCESSED_DIR, logger
-from src.utils.io_utils import to_excel_safe
+from config import PROCESSED_DIR, SPLIT_FORMAT, logger
+from src.utils.perf_utils import timed
 
 MASTER = PROCESSED_DIR / "master.xlsx"
 OUT_DIR = PROCESSED_DIR / "by_product"
 
 
 def ensure_master_if_missing() -> None:
+    import pandas as pd
+
     if MASTER.exists():
         return
     logger.warning(f"{MASTER} does not exist. Creating example")
@@ -31,9 +32,12 @@ def sanitize_filename(text: str) -> str:
     return s[:80]
 
 
+@timed()
 def main():
+    from src.utils.io_utils import read_excel_safe, write_partitioned
+
     ensure_master_if_missing()
-    df = pd.read_excel(MASTER)
+    df = read_excel_safe(MASTER)
 
     if "product" not in df.columns:
         raise ValueError("Not found")
@@ -47,11 +51,8 @@ def main():
     products = df["product"].unique().tolist()
     logger.info(f"Products found: {products}")
 
-    for prod, subdf in df.groupby("product"):
-        fname = f"product_{sanitize_filename(prod)}.xlsx"
-        out_path = OUT_DIR / fname
-        to_excel_safe(subdf, out_path, index=False)
-        logger.info(f"Saved in {out_path}")
+    write_partitioned(df, "product", OUT_DIR, name=lambda prod: f"product_{sanitize_filename(prod)}",
+                      fmt=SPLIT_FORMAT)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
 from pathlib import Path
 from urllib.parse import urlparse
 from config import RAW_DIR, logger
-from src.utils.web_utils import download_file
+from src.utils.perf_utils import timed
 
 URLS_TXT = RAW_DIR / "urls.txt"
 DEST_DIR = RAW_DIR / "downloads"
+VALIDATORS_PATH = DEST_DIR / ".validators.json"
 
 
 def sanitize_filename(text: str) -> str:
@@ -14,14 +15,17 @@ def sanitize_filename(text: str) -> str:
     return (s or "file").strip()[:120]
 
 
-def unique_path(base: Path) -> Path:
-    if not base.exists():
+def unique_path(base: Path, taken: set[Path] | None = None) -> Path:
+    taken = taken if taken is not None else set()
+    if not base.exists() and base not in taken:
+        taken.add(base)
         return base
     stem, suffix = base.stem, base.suffix
     i = 1
     while True:
         candidate = base.with_name(f"{stem}_{i}{suffix}")
-        if not candidate.exists():
+        if not candidate.exists() and candidate not in taken:
+            taken.add(candidate)
             return candidate
         i += 1
 
@@ -38,7 +42,10 @@ def derive_filename_from_url(url: str) -> str:
     return sanitize_filename(name)
 
 
+@timed()
 def main():
+    from src.utils.web_utils import download_many, ValidatorStore
+
     if not URLS_TXT.exists():
         logger.error(f"{URLS_TXT} does not exist")
         return
@@ -53,14 +60,17 @@ def main():
     DEST_DIR.mkdir(parents=True, exist_ok=True)
     logger.info(f"Downloading {len(urls)} files in {DEST_DIR}")
 
-    for url in urls:
-        try:
-            filename = derive_filename_from_url(url)
-            dest = unique_path(DEST_DIR / filename)
-            download_file(url, dest)
-            logger.info(f"{url} -> {dest.name}")
-        except Exception as e:
-            logger.exception(f"{url} download failed: {e}")
+    # Destinations are reserved up front so concurrent downloads never collide
+    taken = set()
+    jobs = [(url, unique_path(DEST_DIR / derive_filename_from_url(url), taken)) for url in urls]
+
+    for url, result in download_many(jobs, validators=ValidatorStore(VALIDATORS_PATH)):
+        if isinstance(result, Exception):
+            logger.error(f"{url} download failed: {result}", exc_info=result)
+        elif result is None:
+            logger.info(f"{url} unchanged, skipped")
+        else:
+            logger.info(f"{url} -> {result.name}")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 from pathlib import Path
-import pandas as pd
+from itertools import chain
 from config import RAW_DIR, PROCESSED_DIR, logger
-from src.utils.io_utils import to_excel_safe
+from src.utils.perf_utils import timed
 
 OUT_PATH = PROCESSED_DIR / "last_sheet.xlsx"
 
@@ -11,34 +11,28 @@ def find_latest_xlsx(raw_dir: Path) -> Path | None:
     return max(files, key=lambda p: p.stat().st_mtime) if files else None
 
 
+@timed()
 def main():
+    from src.utils.io_utils import sheet_names, union_sheets, to_excel_stream
+
     src = find_latest_xlsx(RAW_DIR)
     if src is None:
         logger.error(f"No files in {RAW_DIR}")
         return
 
     logger.info(f"Processing book: {src.name}")
-    book = pd.read_excel(src, sheet_name=None)
-    if not book:
+    if not sheet_names(src):
         logger.error(f"No sheets in {src.name}")
         return
 
-    frames = []
-    for sheet_name, df in book.items():
-        if df is None or df.empty:
-            logger.info(f"{sheet_name} is empty")
-            continue
-        df = df.copy()
-        df["sheet"] = sheet_name
-        frames.append(df)
-
-    if not frames:
+    chunks = union_sheets(src)
+    first = next(chunks, None)
+    if first is None:
         logger.error("All sheets are empty")
         return
 
-    union = pd.concat(frames, ignore_index=True)
-    to_excel_safe(union, OUT_PATH, index=True)
-    logger.info(f"File saved in {OUT_PATH}. (Rows= {len(union)})")
+    rows = to_excel_stream(chain([first], chunks), OUT_PATH, index=True)
+    logger.info(f"File saved in {OUT_PATH}. (Rows= {rows})")
 
 
 if __name__ == "__main__":
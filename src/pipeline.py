@@ -0,0 +1,49 @@
+from config import RAW_DIR, PROCESSED_DIR, DATA_DIR, LOG_DIR, DAG_WORKERS, MASTER_STORAGE
+from src.utils.dag_utils import Step, run_dag
+
+STATE_PATH = DATA_DIR / ".dag_state.json"
+HISTORY_PATH = LOG_DIR / "dag_runs.jsonl"
+
+
+def build_steps() -> list[Step]:
+    raw_xlsx = RAW_DIR / "*.xlsx"
+    return [
+        Step("ex01", "src.exercises.ex01",
+             outputs=[RAW_DIR / "ventas.csv", PROCESSED_DIR / "ventas_filtrado.xlsx"]),
+        Step("ex02", "src.exercises.ex02", inputs=[RAW_DIR / "ventas.csv"],
+             outputs=[PROCESSED_DIR / "valores_zscore.xlsx"]),
+        Step("ex07", "src.exercises.ex07", inputs=[RAW_DIR / "ventas.csv"],
+             outputs=[PROCESSED_DIR / "precio_histograma.png", PROCESSED_DIR / "productos_conteo.png"]),
+        Step("ex03", "src.exercises.ex03", always=True,
+             outputs=[RAW_DIR / "airtravel.csv", PROCESSED_DIR / "airtravel_top.xlsx"]),
+        Step("ex05", "src.exercises.ex05", inputs=[RAW_DIR / "airtravel.csv"],
+             outputs=[PROCESSED_DIR / "airtravel_1958_line.png"]),
+        Step("ex04", "src.exercises.ex04", always=True,
+             outputs=[PROCESSED_DIR / "customers_from_html.xlsx"]),
+        # ex08 seeds sample workbooks when RAW_DIR has none, so the other
+        # workbook readers wait for it
+        Step("ex08", "src.exercises.ex08", inputs=[raw_xlsx],
+             outputs=[PROCESSED_DIR / "master.xlsx"]),
+        Step("ex09", "src.exercises.ex09", inputs=[PROCESSED_DIR / "master.xlsx"],
+             outputs=[PROCESSED_DIR / "by_product"]),
+        Step("ex06", "src.exercises.ex06", inputs=[raw_xlsx], after=["ex08"],
+             outputs=[PROCESSED_DIR / "maestro_ventas" / "_meta.json" if MASTER_STORAGE == "parquet"
+                      else PROCESSED_DIR / "maestro_ventas.xlsx"]),
+        Step("ex10", "src.exercises.ex10", inputs=[raw_xlsx], after=["ex08"],
+             outputs=[PROCESSED_DIR / "main.xlsx"]),
+        Step("ex12", "src.exercises.ex12", inputs=[raw_xlsx], after=["ex08"],
+             outputs=[PROCESSED_DIR / "last_sheet.xlsx"]),
+        Step("ex11", "src.exercises.ex11", inputs=[RAW_DIR / "urls.txt"], always=True,
+             outputs=[RAW_DIR / "downloads"]),
+    ]
+
+
+def main(only: list[str] | None = None, force: bool = False, workers: int = DAG_WORKERS):
+    steps = build_steps()
+    if only:
+        steps = [s for s in steps if s.name in only]
+    return run_dag(steps, STATE_PATH, workers=workers, force=force, history_path=HISTORY_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import shutil
+from config import logger
+
+SNAPSHOT_FMT = "%Y%m%d_%H%M%S"
+
+
+def _sha1_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def list_snapshots(backup_dir: Path) -> list[Path]:
+    return sorted((backup_dir / "snapshots").glob("*.json"))
+
+
+def _snapshot_time(path: Path) -> datetime:
+    return datetime.strptime(path.stem, SNAPSHOT_FMT)
+
+
+def _store_object(src: Path, objects: Path, digest: str) -> None:
+    # Objects are recompressed with zstd; identical partitions are stored once
+    import pyarrow.parquet as pq
+
+    dest = objects / f"{digest}.parquet"
+    if dest.exists():
+        return
+    objects.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".tmp")
+    pq.write_table(pq.read_table(src), tmp, compression="zstd")
+    tmp.replace(dest)
+
+
+def snapshot(root: Path, backup_dir: Path, pattern: str = "*.parquet") -> Path | None:
+    files = sorted(root.glob(pattern))
+    if not files:
+        return None
+    previous = {}
+    snaps = list_snapshots(backup_dir)
+    if snaps:
+        previous = json.loads(snaps[-1].read_text(encoding="utf-8"))["files"]
+
+    entries = {}
+    new_objects = 0
+    for f in files:
+        st = f.stat()
+        prev = previous.get(f.name)
+        if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            digest = prev["sha1"]
+        else:
+            digest = _sha1_file(f)
+            if not (backup_dir / "objects" / f"{digest}.parquet").exists():
+                new_objects += 1
+            _store_object(f, backup_dir / "objects", digest)
+        entries[f.name] = {"sha1": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    out = backup_dir / "snapshots" / f"{datetime.now().strftime(SNAPSHOT_FMT)}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"source": str(root), "files": entries}, indent=2), encoding="utf-8")
+    logger.info(f"Backup snapshot {out.stem}: {len(entries)} partitions, {new_objects} new")
+    return out
+
+
+def select_retained(times: list[datetime], keep_daily: int, keep_weekly: int,
+                    keep_last: int = 0) -> set[datetime]:
+    # The `keep_last` newest snapshots, plus the newest of each of the last
+    # `keep_daily` days and `keep_weekly` ISO weeks. keep_last protects the
+    # snapshots taken before each of today's runs, which the daily set alone
+    # would collapse into one
+    newest = sorted(times, reverse=True)
+    keep = set(newest[:keep_last])
+    days, weeks = {}, {}
+    for t in newest:
+        days.setdefault(t.date(), t)
+        weeks.setdefault(t.isocalendar()[:2], t)
+    keep.update(list(days.values())[:keep_daily])
+    keep.update(list(weeks.values())[:keep_weekly])
+    return keep
+
+
+def prune(backup_dir: Path, keep_daily: int, keep_weekly: int, keep_last: int = 0) -> int:
+    snaps = list_snapshots(backup_dir)
+    keep = select_retained([_snapshot_time(s) for s in snaps], keep_daily, keep_weekly, keep_last)
+    removed = 0
+    for s in snaps:
+        if _snapshot_time(s) not in keep:
+            s.unlink()
+            removed += 1
+
+    referenced = set()
+    for s in list_snapshots(backup_dir):
+        referenced.update(e["sha1"] for e in json.loads(s.read_text(encoding="utf-8"))["files"].values())
+    for obj in (backup_dir / "objects").glob("*.parquet"):
+        if obj.stem not in referenced:
+            obj.unlink()
+    if removed:
+        logger.info(f"Backup retention removed {removed} snapshots")
+    return removed
+
+
+def prune_files(files: list[Path], keep_daily: int, keep_weekly: int, keep_last: int = 0) -> int:
+    # Same policy for plain timestamped files (name ends with _YYYYmmdd_HHMMSS)
+    stamped = {}
+    for f in files:
+        try:
+            stamped[datetime.strptime(f.stem[-15:], SNAPSHOT_FMT)] = f
+        except ValueError:
+            continue
+    keep = select_retained(list(stamped), keep_daily, keep_weekly, keep_last)
+    removed = 0
+    for t, f in stamped.items():
+        if t not in keep:
+            f.unlink()
+            removed += 1
+    return removed
+
+
+def restore(backup_dir: Path, root: Path, as_of: datetime | None = None) -> Path:
+    snaps = [s for s in list_snapshots(backup_dir) if as_of is None or _snapshot_time(s) <= as_of]
+    if not snaps:
+        raise ValueError(f"No backup snapshot at or before {as_of}")
+    snap = snaps[-1]
+    files = json.loads(snap.read_text(encoding="utf-8"))["files"]
+
+    staging = root.with_name(root.name + ".restore")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    for name, entry in files.items():
+        shutil.copyfile(backup_dir / "objects" / f"{entry['sha1']}.parquet", staging / name)
+
+    old = root.with_name(root.name + ".old")
+    if root.exists():
+        if old.exists():
+            shutil.rmtree(old)
+        root.replace(old)
+    staging.replace(root)
+    if old.exists():
+        shutil.rmtree(old)
+    logger.info(f"Restored {len(files)} partitions from snapshot {snap.stem} into {root}")
+    return snap
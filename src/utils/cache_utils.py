@@ -0,0 +1,71 @@
+from pathlib import Path
+import hashlib
+import os
+import pandas as pd
+from config import logger, CACHE_DIR, CACHE_MAX_BYTES, PARSE_CACHE
+
+CACHE_SUFFIX = ".pkl"
+
+
+def cache_key(path: Path, **kwargs) -> str:
+    st = path.stat()
+    raw = f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}|{sorted(kwargs.items())!r}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def cached_read(reader, path: Path, **kwargs):
+    if not PARSE_CACHE:
+        return reader(path, **kwargs)
+
+    entry = CACHE_DIR / f"{cache_key(path, **kwargs)}{CACHE_SUFFIX}"
+    if entry.exists():
+        try:
+            data = pd.read_pickle(entry)
+            os.utime(entry)
+            logger.debug(f"Cache hit: {path}")
+            return data
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {entry.name}: {e}")
+            entry.unlink(missing_ok=True)
+
+    data = reader(path, **kwargs)
+    _store(entry, data)
+    return data
+
+
+def _store(entry: Path, data) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        pd.to_pickle(data, tmp)
+        tmp.replace(entry)
+        evict(CACHE_MAX_BYTES)
+    except Exception as e:
+        logger.warning(f"Could not cache {entry.name}: {e}")
+
+
+def evict(max_bytes: int) -> int:
+    entries = []
+    for p in CACHE_DIR.glob(f"*{CACHE_SUFFIX}"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"Cache evicted {removed} entries ({total} bytes kept)")
+    return removed
+
+
+def clear_cache() -> None:
+    for p in CACHE_DIR.glob(f"*{CACHE_SUFFIX}"):
+        p.unlink(missing_ok=True)
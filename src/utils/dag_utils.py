@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+import hashlib
+import importlib
+import importlib.util
+import json
+import time
+from config import logger
+
+
+@dataclass
+class Step:
+    name: str
+    module: str
+    inputs: list[Path] = field(default_factory=list)  # may contain glob patterns
+    outputs: list[Path] = field(default_factory=list)
+    after: list[str] = field(default_factory=list)  # ordering not visible from paths
+    always: bool = False  # e.g. network steps, whose real input is remote
+    kwargs: dict = field(default_factory=dict)
+
+
+def _expand(paths: list[Path]) -> list[Path]:
+    files = []
+    for p in paths:
+        if any(ch in p.name for ch in "*?["):
+            files.extend(sorted(p.parent.glob(p.name)))
+        elif p.is_dir():
+            files.extend(sorted(f for f in p.rglob("*") if f.is_file()))
+        elif p.exists():
+            files.append(p)
+    return files
+
+
+def fingerprint(step: Step) -> str:
+    h = hashlib.sha1()
+    spec = importlib.util.find_spec(step.module)
+    sources = [Path(spec.origin)] if spec and spec.origin else []
+    for f in sources + _expand(step.inputs):
+        st = f.stat()
+        h.update(f"{f}|{st.st_size}|{st.st_mtime_ns}\n".encode("utf-8"))
+    h.update(json.dumps(step.kwargs, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _produces(producer: Step, consumer: Step) -> bool:
+    for inp in consumer.inputs:
+        for out in producer.outputs:
+            if out == inp or fnmatch(str(out), str(inp)) or inp in out.parents or out in inp.parents:
+                return True
+    return False
+
+
+def dependencies(steps: list[Step]) -> dict[str, set[str]]:
+    deps = {s.name: set(s.after) for s in steps}
+    for consumer in steps:
+        for producer in steps:
+            if producer is not consumer and _produces(producer, consumer):
+                deps[consumer.name].add(producer.name)
+    names = set(deps)
+    return {k: v & names for k, v in deps.items()}
+
+
+def _is_fresh(step: Step, state: dict) -> bool:
+    if step.always or not step.outputs:
+        return False
+    if not all(p.exists() for p in step.outputs):
+        return False
+    return state.get(step.name, {}).get("fingerprint") == fingerprint(step)
+
+
+def _run_step(module: str, kwargs: dict) -> float:
+    start = time.perf_counter()
+    importlib.import_module(module).main(**kwargs)
+    return time.perf_counter() - start
+
+
+def run_dag(steps: list[Step], state_path: Path, workers: int = 1, force: bool = False,
+            history_path: Path | None = None) -> dict[str, dict]:
+    deps = dependencies(steps)
+    by_name = {s.name: s for s in steps}
+    state = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
+    results = {}
+    running = {}
+    started = time.perf_counter()
+
+    def ready() -> list[Step]:
+        busy = set(results) | set(running.values())
+        return [s for s in steps if s.name not in busy and deps[s.name] <= set(results)]
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as ex:
+        while len(results) < len(steps):
+            batch = ready()
+            if not batch and not running:
+                raise ValueError(f"Dependency cycle among: {sorted(set(by_name) - set(results))}")
+            for step in batch:
+                failed = [d for d in deps[step.name] if results[d]["status"] in ("failed", "blocked")]
+                if failed:
+                    results[step.name] = {"status": "blocked", "seconds": 0.0}
+                    logger.warning(f"[dag] {step.name} blocked by {failed}")
+                elif not force and _is_fresh(step, state):
+                    results[step.name] = {"status": "skipped", "seconds": 0.0}
+                    logger.info(f"[dag] {step.name} up to date, skipped")
+                else:
+                    logger.info(f"[dag] {step.name} started")
+                    running[ex.submit(_run_step, step.module, step.kwargs)] = step.name
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    seconds = fut.result()
+                    results[name] = {"status": "ran", "seconds": seconds}
+                    state[name] = {"fingerprint": fingerprint(by_name[name]),
+                                   "seconds": seconds, "finished": datetime.now().isoformat(timespec="seconds")}
+                    logger.info(f"[dag] {name} finished in {seconds:.2f}s")
+                except Exception as e:
+                    results[name] = {"status": "failed", "seconds": 0.0, "error": str(e)}
+                    logger.error(f"[dag] {name} failed: {e}", exc_info=e)
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    total = time.perf_counter() - started
+    summary = ", ".join(f"{n}={r['status']}:{r['seconds']:.2f}s" for n, r in results.items())
+    logger.info(f"[dag] run finished in {total:.2f}s | {summary}")
+    if history_path is not None:
+        record = {"finished": datetime.now().isoformat(timespec="seconds"), "seconds": total, "steps": results}
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    return results
@@ -0,0 +1,79 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+from config import logger
+
+
+def _downcast_float(s: pd.Series) -> pd.Series:
+    # Only keep float32 when it round-trips exactly, so prices never lose cents
+    f32 = s.astype(np.float32)
+    if np.array_equal(f32.to_numpy(dtype=np.float64), s.to_numpy(dtype=np.float64), equal_nan=True):
+        return f32
+    return s
+
+
+def _downcast_int(s: pd.Series, min_bits: int) -> pd.Series:
+    # Never below min_bits: products like precio * ud_vendidas would overflow int8
+    if not len(s):
+        return s
+    lo, hi = s.min(), s.max()
+    for bits in (8, 16, 32, 64):
+        if bits < min_bits:
+            continue
+        info = np.iinfo(f"int{bits}")
+        if info.min <= lo and hi <= info.max:
+            return s.astype(f"int{bits}")
+    return s
+
+
+def _is_date_objects(s: pd.Series) -> bool:
+    sample = s.dropna().head(100)
+    return len(sample) > 0 and all(isinstance(v, (dt.date, dt.datetime)) for v in sample)
+
+
+def optimize_dtypes(df: pd.DataFrame, category_max_ratio: float = 0.5, min_int_bits: int = 32) -> pd.DataFrame:
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+            out[col] = s
+        elif pd.api.types.is_integer_dtype(s) and isinstance(s.dtype, np.dtype):
+            out[col] = _downcast_int(s, min_int_bits)
+        elif pd.api.types.is_float_dtype(s) and isinstance(s.dtype, np.dtype):
+            out[col] = _downcast_float(s)
+        elif pd.api.types.is_datetime64_any_dtype(s):
+            out[col] = s
+        elif _is_date_objects(s):
+            out[col] = pd.to_datetime(s, errors="coerce")
+        elif s.dtype == object or pd.api.types.is_string_dtype(s):
+            n_unique = s.nunique(dropna=True)
+            out[col] = s.astype("category") if n_unique <= category_max_ratio * len(s) else s
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame, label: str = "") -> dict[str, tuple[int, int]]:
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    per_column = {c: (int(b[c]), int(a[c])) for c in after.columns if c in b}
+    total_b, total_a = int(b.sum()), int(a.sum())
+    saved = 100 * (1 - total_a / total_b) if total_b else 0.0
+    logger.info(f"Memory {label}: {_fmt_bytes(total_b)} -> {_fmt_bytes(total_a)} (-{saved:.0f}%)")
+    for c, (cb, ca) in per_column.items():
+        logger.debug(f"  {c}: {before[c].dtype} {cb} B -> {after[c].dtype} {ca} B")
+    return per_column
+
+
+def optimize_with_report(df: pd.DataFrame, label: str = "", **kwargs) -> pd.DataFrame:
+    optimized = optimize_dtypes(df, **kwargs)
+    memory_report(df, optimized, label)
+    return optimized
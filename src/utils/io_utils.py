@@ -1,21 +1,398 @@
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator
+import hashlib
+import importlib.util
+import json
+import numpy as np
 import pandas as pd
-from config import logger, DEFAULT_CSV_ENCODING
+from config import (logger, DEFAULT_CSV_ENCODING, INGEST_WORKERS, INGEST_POOL, EXPORT_WORKERS, SHEET_WORKERS,
+                    EXCEL_ENGINE)
+from src.utils.cache_utils import cached_read
+from src.utils.perf_utils import map_settled, timed
 
-def read_csv_safe(path: Path, **kwargs) -> pd.DataFrame:
+EXCEL_MAX_ROWS = 1_048_576
+
+@timed()
+def read_csv_safe(path: Path, use_cache: bool = True, **kwargs) -> pd.DataFrame:
     try:
         logger.info(f"Reading CSV: {path}")
-        return pd.read_csv(path, encoding=DEFAULT_CSV_ENCODING, **kwargs)
+        kwargs.setdefault("encoding", DEFAULT_CSV_ENCODING)
+        if use_cache and not kwargs.get("chunksize") and not kwargs.get("iterator"):
+            return cached_read(pd.read_csv, path, **kwargs)
+        return pd.read_csv(path, **kwargs)
     except Exception as e:
         logger.exception(f"Error reading CSV {path}: {e}")
         raise
 
 
-def to_excel_safe(df: pd.DataFrame, path: Path, index: bool = False) -> None:
+def _unique_header(values: tuple) -> list[str]:
+    # Same labels pandas gives: "Unnamed: i" for blanks, "name.1" for repeats
+    header, seen = [], {}
+    for i, v in enumerate(values):
+        name = f"Unnamed: {i}" if v is None or v == "" else v
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+
+def _used_width(row: tuple) -> int:
+    width = len(row)
+    while width and row[width - 1] is None:
+        width -= 1
+    return width
+
+
+def _wanted_positions(usecols: list, header: list[str]) -> list[int]:
+    # Names, positions and pandas' "Unnamed: n" labels for cells past the header
+    positions, missing = set(), []
+    for c in usecols:
+        if isinstance(c, int):
+            positions.add(c)
+        elif c in header:
+            positions.add(header.index(c))
+        elif isinstance(c, str) and c.startswith("Unnamed: ") and c[9:].isdigit():
+            positions.add(int(c[9:]))
+        else:
+            missing.append(c)
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+    return sorted(positions)
+
+
+def _read_sheet_openpyxl(ws, usecols: list | None, nrows: int | None) -> pd.DataFrame:
+    # Like pandas, ignore the sheet's <dimension> tag: some writers leave it
+    # stale and read-only openpyxl would silently stop at the rows it claims
+    ws.reset_dimensions()
+    rows = ws.iter_rows(values_only=True)
+    first = next(rows, None)
+    if first is None:
+        return pd.DataFrame()
+    header = _unique_header(first[:_used_width(first)])
+    keep = _wanted_positions(usecols, header) if usecols is not None else None
+
+    data = []
+    width = len(header)
+    filled = 0  # rows up to the last one with any value (trailing blank rows are dropped)
+    for row in rows:
+        if nrows is not None and len(data) >= nrows:
+            break
+        used = _used_width(row)
+        if used:
+            filled = len(data) + 1
+        if keep is not None:
+            row = tuple(row[i] if i < len(row) else None for i in keep)
+        else:
+            width = max(width, used)
+        data.append(row)
+    del data[filled:]
+
+    if keep is None:
+        # Cells past the header keep pandas' "Unnamed: n" names instead of being dropped
+        header = header + [f"Unnamed: {i}" for i in range(len(header), width)]
+        keep = range(width)
+        data = [r[:width] + (None,) * (width - len(r)) for r in data]
+    columns = [header[i] if i < len(header) else f"Unnamed: {i}" for i in keep]
+    if not data:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame.from_records(data, columns=columns).infer_objects()
+    # Like pandas' parser, text columns that are entirely numeric become numbers
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+def _read_excel_openpyxl(path: Path, sheet_name=0, usecols: list | None = None,
+                         nrows: int | None = None) -> pd.DataFrame | dict[str, pd.DataFrame]:
+    # values_only rows from a read-only workbook: no Cell objects are built,
+    # iteration stops after nrows and only the usecols columns are kept
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        if sheet_name is None:
+            return {ws.title: _read_sheet_openpyxl(ws, usecols, nrows) for ws in wb.worksheets}
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        return _read_sheet_openpyxl(ws, usecols, nrows)
+    finally:
+        wb.close()
+
+
+def _read_excel_calamine(path: Path, **kwargs):
+    return pd.read_excel(path, engine="calamine", **kwargs)
+
+
+def _read_excel_pandas(path: Path, **kwargs):
+    return pd.read_excel(path, engine="openpyxl", **kwargs)
+
+
+EXCEL_ENGINES = {
+    "calamine": _read_excel_calamine,
+    "openpyxl": _read_excel_openpyxl,
+    "pandas": _read_excel_pandas,
+}
+# What the openpyxl engine understands; other options (dtype, skiprows, ...) go to pandas
+_OPENPYXL_KWARGS = {"sheet_name", "usecols", "nrows"}
+
+
+def excel_engine(engine: str = EXCEL_ENGINE, **kwargs) -> str:
+    if engine != "auto":
+        return engine
+    if importlib.util.find_spec("python_calamine"):
+        return "calamine"
+    usecols = kwargs.get("usecols")
+    if set(kwargs) <= _OPENPYXL_KWARGS and not isinstance(usecols, str) and not callable(usecols):
+        return "openpyxl"
+    return "pandas"
+
+
+def read_excel(path: Path, engine: str = EXCEL_ENGINE, **kwargs) -> pd.DataFrame | dict[str, pd.DataFrame]:
+    return EXCEL_ENGINES[excel_engine(engine, **kwargs)](path, **kwargs)
+
+
+def read_excel_safe(path: Path, use_cache: bool = True, **kwargs) -> pd.DataFrame:
+    try:
+        logger.info(f"Reading Excel: {path}")
+        if use_cache:
+            return cached_read(read_excel, path, **kwargs)
+        return read_excel(path, **kwargs)
+    except Exception as e:
+        logger.exception(f"Error reading Excel {path}: {e}")
+        raise
+
+
+@timed()
+def to_excel_safe(df: pd.DataFrame, path: Path, index: bool = False, streaming: bool = False) -> None:
     try:
         logger.info(f"Writing Excel: {path}")
         path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_excel(path, index=index)
+        if streaming:
+            to_excel_stream(df, path, index=index)
+        else:
+            df.to_excel(path, index=index)
     except Exception as e:
         logger.exception(f"Error writting Excel {path}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def _iter_chunks(data: pd.DataFrame | Iterable[pd.DataFrame], chunk_size: int) -> Iterable[pd.DataFrame]:
+    if isinstance(data, pd.DataFrame):
+        # An empty frame still yields one chunk, so its header gets written
+        for start in range(0, max(len(data), 1), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    else:
+        yield from data
+
+
+def to_excel_stream(data: pd.DataFrame | Iterable[pd.DataFrame], path: Path, index: bool = False,
+                    sheet_name: str = "Sheet1", chunk_size: int = 50_000,
+                    max_rows: int = EXCEL_MAX_ROWS, columns: list | None = None) -> int:
+    # Rows go through a write-only workbook chunk by chunk, so memory does not
+    # grow with the export. A new sheet is started when one would overflow.
+    # The header is always written: from the first chunk, even without rows,
+    # or from `columns` when the iterable yields nothing at all.
+    from openpyxl import Workbook
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb = Workbook(write_only=True)
+    ws = None
+    header = [str(c) for c in columns] if columns is not None else None
+    sheet_no = 0
+    sheet_rows = 0
+    total = 0
+
+    for chunk in _iter_chunks(data, chunk_size):
+        if index:
+            chunk = chunk.rename_axis(chunk.index.name or "").reset_index()
+        if total == 0:
+            header = [str(c) for c in chunk.columns]
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if ws is None or sheet_rows >= max_rows:
+                sheet_no += 1
+                ws = wb.create_sheet(sheet_name if sheet_no == 1 else f"{sheet_name}_{sheet_no}")
+                ws.append(header)
+                sheet_rows = 1
+            ws.append(row)
+            sheet_rows += 1
+            total += 1
+
+    if ws is None:
+        ws = wb.create_sheet(sheet_name)
+        if header:
+            ws.append(header)
+    wb.save(path)
+    if sheet_no > 1:
+        logger.info(f"{total} rows split across {sheet_no} sheets in {path}")
+    return total
+
+
+def read_excel_many(paths: list[Path], workers: int = INGEST_WORKERS, pool: str = INGEST_POOL,
+                    **kwargs) -> list[tuple[Path, pd.DataFrame | Exception]]:
+    # A failed file yields its exception (see perf_utils.settle)
+    reader = partial(cached_read, read_excel, **kwargs)
+    workers = max(1, min(workers, len(paths)))
+    if workers == 1:
+        return map_settled(reader, paths)
+
+    executor_cls = ThreadPoolExecutor if pool == "thread" else ProcessPoolExecutor
+    logger.info(f"Reading {len(paths)} workbooks with {workers} {pool} workers")
+    with executor_cls(max_workers=workers) as ex:
+        return map_settled(reader, paths, ex)
+
+
+def sheet_names(path: Path) -> list[str]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def sheet_headers(path: Path) -> dict[str, list[str]]:
+    # Columns of every worksheet as the readers name them: the header row plus
+    # "Unnamed: i" for cells past it. Rows are scanned as plain values from
+    # openpyxl, so the data is neither parsed into frames nor cached
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        headers = {}
+        for ws in wb.worksheets:
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            first = next(rows, ())
+            header = _unique_header(first[:_used_width(first)])
+            width = max((_used_width(row) for row in rows), default=0)
+            headers[ws.title] = header + [f"Unnamed: {i}" for i in range(len(header), width)]
+        return headers
+    finally:
+        wb.close()
+
+
+def iter_excel_sheets(path: Path, workers: int = SHEET_WORKERS, **kwargs) -> Iterator[tuple[str, pd.DataFrame]]:
+    # Yields sheets in workbook order; with workers > 1 at most `workers`
+    # sheets are parsed ahead, so memory stays bounded by the window
+    names = sheet_names(path)
+    if workers <= 1:
+        for name in names:
+            yield name, read_excel_safe(path, sheet_name=name, **kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = []
+        for name in names:
+            pending.append((name, ex.submit(read_excel_safe, path, sheet_name=name, **kwargs)))
+            if len(pending) >= workers:
+                head, fut = pending.pop(0)
+                yield head, fut.result()
+        for name, fut in pending:
+            yield name, fut.result()
+
+
+def union_sheets(path: Path, tag: str = "sheet", workers: int = SHEET_WORKERS) -> Iterator[pd.DataFrame]:
+    # Streams every non-empty sheet aligned to the union of all headers, tagged
+    # with a categorical sheet column and a running index across sheets
+    headers = sheet_headers(path)
+    names = list(headers)
+    columns = []
+    for header in headers.values():
+        for c in header:
+            if c not in columns:
+                columns.append(c)
+    tags = pd.CategoricalDtype(names)
+
+    offset = 0
+    for name, df in iter_excel_sheets(path, workers=workers, use_cache=False):
+        if df is None or df.empty:
+            logger.info(f"{name} is empty")
+            continue
+        if list(df.columns) != columns:
+            df = df.reindex(columns=columns)
+        df[tag] = pd.Categorical.from_codes(np.full(len(df), names.index(name)), dtype=tags)
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        offset += len(df)
+        yield df
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    h = hashlib.sha1(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _write_partition(df: pd.DataFrame, path: Path, fmt: str) -> Path:
+    if fmt == "xlsx":
+        to_excel_safe(df, path, index=False)
+    elif fmt == "csv":
+        df.to_csv(path, index=False, encoding=DEFAULT_CSV_ENCODING)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unknown partition format: {fmt}")
+    return path
+
+
+def write_partitioned(df: pd.DataFrame, key: str, out_dir: Path, name: Callable[[object], str],
+                      fmt: str = "xlsx", workers: int = EXPORT_WORKERS) -> dict[str, int]:
+    # One sort, then contiguous slices per key value; partitions whose content
+    # digest matches the manifest from the previous run are not rewritten
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "_manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+
+    # Rows with a missing key are dropped, as groupby does; NaN != NaN would
+    # otherwise make each of them its own partition
+    ordered = df[df[key].notna()].sort_values(key, kind="stable")
+    keys = ordered[key].to_numpy()
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=int)
+    ends = np.r_[starts[1:], len(keys)]
+
+    paths = [out_dir / f"{name(keys[start])}.{fmt}" for start in starts]
+    seen = set()
+    clashes = sorted({p.name for p in paths if p in seen or seen.add(p)})
+    if clashes:
+        raise ValueError(f"Several {key} values map to the same file: {clashes}")
+
+    jobs = []
+    unchanged = 0
+    new_manifest = {k: v for k, v in manifest.items() if not k.endswith(f".{fmt}")}
+    for start, end, path in zip(starts, ends, paths):
+        part = ordered.iloc[start:end]
+        digest = frame_digest(part)
+        new_manifest[path.name] = digest
+        if manifest.get(path.name) == digest and path.exists():
+            unchanged += 1
+            continue
+        jobs.append((part, path))
+
+    failed = 0
+    if jobs:
+        executor_cls = ProcessPoolExecutor if fmt == "xlsx" else ThreadPoolExecutor
+        workers = max(1, min(workers, len(jobs)))
+        with executor_cls(max_workers=workers) as ex:
+            futures = [ex.submit(_write_partition, part, path, fmt) for part, path in jobs]
+            for (_, path), fut in zip(jobs, futures):
+                try:
+                    fut.result()
+                    logger.info(f"Saved in {path}")
+                except Exception as e:
+                    failed += 1
+                    new_manifest.pop(path.name, None)
+                    logger.error(f"Error writing partition {path}: {e}", exc_info=e)
+
+    manifest_path.write_text(json.dumps(new_manifest, indent=2), encoding="utf-8")
+    stats = {"written": len(jobs) - failed, "unchanged": unchanged, "failed": failed}
+    logger.info(f"Partitions in {out_dir}: {stats}")
+    return stats
@@ -0,0 +1,176 @@
+from pathlib import Path
+import json
+import numpy as np
+import pandas as pd
+from config import logger
+from src.utils.dtype_utils import optimize_dtypes
+
+PARTITION_COL = "fecha"
+INDEX_DIR = "_index"
+META_FILE = "_meta.json"
+# Rows re-hashed to check a stored index against its partition
+INDEX_CHECK_ROWS = 16
+
+
+def partition_path(root: Path, value) -> Path:
+    return root / f"{PARTITION_COL}={pd.Timestamp(value).date().isoformat()}.parquet"
+
+
+def index_path(root: Path, part: Path) -> Path:
+    return root / INDEX_DIR / part.name
+
+
+def list_partitions(root: Path) -> list[Path]:
+    return sorted(root.glob(f"{PARTITION_COL}=*.parquet"))
+
+
+def _write_atomic(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+
+def key_hashes(df: pd.DataFrame, keys: list[str]) -> np.ndarray:
+    # Same key -> same uint64 whatever the dtype (category/str, date/datetime)
+    # and whatever the datetime unit: dates are hashed at ns resolution
+    frame = pd.DataFrame({
+        k: pd.to_datetime(df[k]).astype("datetime64[ns]").astype("int64") if k == PARTITION_COL
+        else df[k].astype(str)
+        for k in keys
+    })
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def load_meta(root: Path) -> dict:
+    path = root / META_FILE
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    import pyarrow.parquet as pq
+    return {"rows": {p.name: pq.ParquetFile(p).metadata.num_rows for p in list_partitions(root)}}
+
+
+def _save_meta(root: Path, meta: dict) -> None:
+    tmp = root / (META_FILE + ".tmp")
+    tmp.write_text(json.dumps(meta, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(root / META_FILE)
+
+
+def _index_matches(index: pd.Index, df: pd.DataFrame, keys: list[str]) -> bool:
+    # Same length, and a handful of evenly spaced rows re-hash to the stored
+    # values: catches replaced partitions and indexes hashed another way
+    # without re-hashing the whole partition
+    if len(index) != len(df):
+        return False
+    if not len(df):
+        return True
+    rows = np.unique(np.linspace(0, len(df) - 1, min(INDEX_CHECK_ROWS, len(df))).astype(int))
+    return bool((key_hashes(df.iloc[rows], keys) == index.to_numpy()[rows]).all())
+
+
+def load_index(root: Path, part: Path, df: pd.DataFrame | None, keys: list[str]) -> pd.Index:
+    # Hash -> row position within the partition; rebuilt from data (and saved)
+    # when missing or out of step with it, e.g. the partition was replaced
+    if df is None:
+        return pd.Index(np.array([], dtype=np.uint64))
+    path = index_path(root, part)
+    if path.exists():
+        index = pd.Index(pd.read_parquet(path)["key_hash"].to_numpy())
+        if _index_matches(index, df, keys):
+            return index
+        logger.warning(f"Stale index for {part.name}; rebuilding it")
+    hashes = key_hashes(df, keys)
+    _write_atomic(pd.DataFrame({"key_hash": hashes}), path)
+    return pd.Index(hashes)
+
+
+def read_partition(path: Path) -> pd.DataFrame | None:
+    if not path.exists():
+        return None
+    df = pd.read_parquet(path)
+    df[PARTITION_COL] = pd.to_datetime(df[PARTITION_COL])
+    return df
+
+
+def read_ledger(root: Path, sort_by: list[str] | None = None) -> pd.DataFrame:
+    parts = [read_partition(p) for p in list_partitions(root)]
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True)
+    if sort_by:
+        df = df.sort_values(sort_by, ignore_index=True)
+    return optimize_dtypes(df)
+
+
+def _as_comparable(s: pd.Series) -> pd.Series:
+    return s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s
+
+
+def _same_rows(a: pd.DataFrame, b: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    same = np.ones(len(a), dtype=bool)
+    for c in cols:
+        x, y = _as_comparable(a[c]).reset_index(drop=True), _as_comparable(b[c]).reset_index(drop=True)
+        same &= ((x == y) | (x.isna() & y.isna())).to_numpy()
+    return same
+
+
+def upsert_partition(root: Path, value, chunk: pd.DataFrame, keys: list[str], order_col: str) -> dict[str, int]:
+    path = partition_path(root, value)
+    current = read_partition(path)
+    index = load_index(root, path, current, keys)
+
+    chunk = chunk.sort_values(order_col, kind="stable").drop_duplicates(subset=keys, keep="last")
+    hashes = key_hashes(chunk, keys)
+    rows = index.get_indexer(hashes) if len(index) else np.full(len(hashes), -1)
+
+    hit = rows >= 0
+    value_cols = [c for c in chunk.columns if c not in keys and c != order_col]
+    incoming_hit = chunk[hit]
+    existing_hit = current.iloc[rows[hit]] if current is not None else chunk.iloc[:0]
+    same = _same_rows(existing_hit, incoming_hit, value_cols) if hit.any() else np.array([], dtype=bool)
+
+    updates = incoming_hit[~same].set_axis(rows[hit][~same])
+    inserts = chunk[~hit]
+    stats = {"inserted": len(inserts), "updated": len(updates), "unchanged": int(same.sum())}
+    if not len(updates) and not len(inserts):
+        return stats
+
+    # Updated rows keep their position, so the stored hash -> row index stays
+    # valid; new keys are appended after the existing rows
+    base = current if current is not None else chunk.iloc[:0]
+    base = pd.concat([base.drop(index=updates.index), updates]).sort_index()
+    merged = pd.concat([base, inserts], ignore_index=True)
+    merged = optimize_dtypes(merged)
+    new_index = np.concatenate([index.to_numpy(dtype=np.uint64), hashes[~hit]])
+
+    _write_atomic(merged, path)
+    _write_atomic(pd.DataFrame({"key_hash": new_index}), index_path(root, path))
+    logger.info(f"Partition written: {path.name} ({len(merged)} rows, {stats})")
+    stats["rows"] = len(merged)
+    return stats
+
+
+def upsert_partitions(root: Path, df_new: pd.DataFrame, keys: list[str], order_col: str) -> dict[str, int]:
+    root.mkdir(parents=True, exist_ok=True)
+    meta = load_meta(root)
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    df_new = df_new.assign(**{PARTITION_COL: pd.to_datetime(df_new[PARTITION_COL])})
+    for value, chunk in df_new.groupby(PARTITION_COL, sort=True):
+        stats = upsert_partition(root, value, chunk, keys, order_col)
+        for k in totals:
+            totals[k] += stats[k]
+        if "rows" in stats:
+            meta["rows"][partition_path(root, value).name] = stats["rows"]
+
+    _save_meta(root, meta)
+    totals["rows"] = sum(meta["rows"].values())
+    return totals
+
+
+def export_excel(root: Path, path: Path, sort_by: list[str] | None = None) -> Path:
+    df = read_ledger(root, sort_by=sort_by)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_excel(path, index=False)
+    logger.info(f"Ledger exported to Excel: {path} ({len(df)} rows)")
+    return path
@@ -0,0 +1,219 @@
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from config import logger, setup_logging, PERF_LOG, PERF_LOG_FILE, PERF_LOGGER, PERF_PROFILE, PROFILE_DIR
+
+perf_logger = logging.getLogger(PERF_LOGGER)
+perf_logger.propagate = False
+
+
+def rss_mb() -> float:
+    # Current resident set size; where /proc is missing, the process peak
+    # (ru_maxrss) stands in, so a delta then shows how far a call raised it
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def emit(record: dict) -> None:
+    if not PERF_LOG:
+        return
+    # Handlers live on the logging queue listener (see config.setup_logging)
+    setup_logging()
+    perf_logger.info(json.dumps(record, default=str))
+    logger.debug(f"perf {record['name']}: {record['duration_s']:.3f}s rows={record.get('rows')} "
+                 f"bytes={record.get('bytes')} rss={record['rss_delta_mb']:+.0f}MB")
+
+
+@contextmanager
+def measure(name: str, **fields):
+    # The caller may add rows/bytes (or anything else) to the yielded dict.
+    # Memory is per call: the RSS change across it and, while tracemalloc is
+    # tracing, the allocation peak within it (the process-wide ru_maxrss would
+    # repeat the largest call's peak in every later record)
+    record = {"name": name, **fields}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    record["status"] = "error"
+    try:
+        yield record
+        record["status"] = "ok"
+    finally:
+        record["duration_s"] = round(time.perf_counter() - start, 6)
+        record["rss_delta_mb"] = round(rss_mb() - rss_before, 1)
+        if tracing:
+            record["peak_alloc_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        record["ts"] = datetime.now().isoformat(timespec="milliseconds")
+        record["pid"] = os.getpid()
+        emit(record)
+
+
+def _size(value) -> int | None:
+    if isinstance(value, (str, Path)) and Path(value).is_file():
+        return Path(value).stat().st_size
+    return None
+
+
+def _describe(result, args: tuple, kwargs: dict) -> dict:
+    # rows from a returned (or passed-in) frame, bytes from the file returned or touched
+    values = [result, *args, *kwargs.values()]
+    info = {}
+    for v in values:
+        shape = getattr(v, "shape", None)
+        if shape is not None and len(shape) == 2:
+            info["rows"] = int(shape[0])
+            break
+    for v in values:
+        size = _size(v)
+        if size is not None:
+            info["bytes"] = size
+            break
+    return info
+
+
+def timed(name: str | None = None):
+    def decorate(func):
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(label) as record:
+                result = func(*args, **kwargs)
+                record.update(_describe(result, args, kwargs))
+            return result
+        return wrapper
+    return decorate
+
+
+def settle(keys, futures) -> list[tuple]:
+    # Results keep the order of `keys` as (key, result), or (key, exception)
+    # when the call raised; works for concurrent and finished asyncio futures
+    results = []
+    for key, fut in zip(keys, futures):
+        try:
+            results.append((key, fut.result()))
+        except Exception as e:
+            results.append((key, e))
+    return results
+
+
+def _run_now(func, item) -> Future:
+    fut = Future()
+    try:
+        fut.set_result(func(item))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+
+def map_settled(func, items: list, executor: Executor | None = None, key=None) -> list[tuple]:
+    # func(item) for every item, all submitted to `executor` up front (or run
+    # inline without one); `key` picks what each result is paired with
+    futures = [executor.submit(func, item) if executor is not None else _run_now(func, item) for item in items]
+    return settle([key(item) for item in items] if key else items, futures)
+
+
+@contextmanager
+def profile_run(name: str, modes: set[str] = PERF_PROFILE):
+    # Optional per-run dumps: <name>_<ts>.prof (cProfile) and <name>_<ts>.mem.txt (tracemalloc)
+    if not modes:
+        yield
+        return
+    stem = PROFILE_DIR / f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    profiler = None
+    if "cprofile" in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+    started_tracing = "tracemalloc" in modes and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(10)
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(f"{stem}.prof")
+            logger.info(f"cProfile stats written to {stem}.prof")
+        if started_tracing:
+            top = tracemalloc.take_snapshot().statistics("lineno")[:30]
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"current={current / 1e6:.1f} MB peak={peak / 1e6:.1f} MB"] + [str(s) for s in top]
+            Path(f"{stem}.mem.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            logger.info(f"tracemalloc top allocations written to {stem}.mem.txt")
+
+
+def load_records(path: Path = PERF_LOG_FILE) -> list[dict]:
+    if not path.exists():
+        return []
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    groups = {}
+    for r in records:
+        groups.setdefault(r["name"], []).append(r)
+    rows = []
+    for name, rs in groups.items():
+        durations = sorted(r["duration_s"] for r in rs)
+        total_rows = sum(r.get("rows") or 0 for r in rs)
+        total = sum(durations)
+        rows.append({
+            "name": name,
+            "calls": len(rs),
+            "errors": sum(r.get("status") == "error" for r in rs),
+            "total_s": total,
+            "mean_s": total / len(rs),
+            "p95_s": durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+            "max_s": durations[-1],
+            "rows_per_s": total_rows / total if total and total_rows else None,
+            "mb": sum(r.get("bytes") or 0 for r in rs) / 1e6,
+            "max_rss_delta_mb": max(r.get("rss_delta_mb") or 0 for r in rs),
+        })
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+
+def print_report(since: str | None = None, name: str | None = None, path: Path = PERF_LOG_FILE) -> None:
+    records = load_records(path)
+    if since:
+        records = [r for r in records if r.get("ts", "") >= since]
+    if name:
+        records = [r for r in records if r["name"].startswith(name)]
+    if not records:
+        print(f"No performance records in {path}")
+        return
+    print(f"{'name':<28}{'calls':>6}{'errors':>7}{'total s':>9}{'mean s':>9}{'p95 s':>9}{'max s':>9}"
+          f"{'rows/s':>11}{'MB':>9}{'+RSS MB':>9}")
+    for r in summarize(records):
+        rate = f"{r['rows_per_s']:.0f}" if r["rows_per_s"] else "-"
+        print(f"{r['name']:<28}{r['calls']:>6}{r['errors']:>7}{r['total_s']:>9.2f}{r['mean_s']:>9.3f}"
+              f"{r['p95_s']:>9.3f}{r['max_s']:>9.3f}{rate:>11}{r['mb']:>9.1f}{r['max_rss_delta_mb']:>9.0f}")
@@ -0,0 +1,109 @@
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+import math
+import pandas as pd
+from config import logger, DEFAULT_CSV_ENCODING
+from src.utils.io_utils import read_csv_safe, to_excel_stream
+
+Stage = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def read_chunks(path: Path, chunksize: int = 100_000, **kwargs) -> Iterator[pd.DataFrame]:
+    reader = read_csv_safe(path, use_cache=False, chunksize=chunksize, **kwargs)
+    with reader:
+        yield from reader
+
+
+def apply_stages(chunks: Iterable[pd.DataFrame], *stages: Stage) -> Iterator[pd.DataFrame]:
+    # Empty chunks are dropped, but when every row is filtered out one empty
+    # chunk still comes through so sinks can write the header
+    kept, empty = 0, None
+    for chunk in chunks:
+        for stage in stages:
+            chunk = stage(chunk)
+        if len(chunk):
+            kept += 1
+            yield chunk
+        elif empty is None:
+            empty = chunk
+    if not kept and empty is not None:
+        yield empty
+
+
+def filter_rows(predicate: Callable[[pd.DataFrame], pd.Series]) -> Stage:
+    return lambda df: df[predicate(df)]
+
+
+def assign(**columns: Callable[[pd.DataFrame], pd.Series]) -> Stage:
+    return lambda df: df.assign(**columns)
+
+
+def sink_csv(chunks: Iterable[pd.DataFrame], path: Path, index: bool = False) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+    with open(path, "w", encoding=DEFAULT_CSV_ENCODING, newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=index, header=i == 0)
+            total += len(chunk)
+    logger.info(f"CSV sink: {path} ({total} rows)")
+    return total
+
+
+def sink_parquet(chunks: Iterable[pd.DataFrame], path: Path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    total = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    logger.info(f"Parquet sink: {path} ({total} rows)")
+    return total
+
+
+def sink_excel(chunks: Iterable[pd.DataFrame], path: Path, index: bool = False) -> int:
+    total = to_excel_stream(chunks, path, index=index)
+    logger.info(f"Excel sink: {path} ({total} rows)")
+    return total
+
+
+class RunningStats:
+    # Welford's online mean/variance, merged chunk by chunk (Chan et al.)
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: pd.Series) -> None:
+        values = pd.to_numeric(values, errors="coerce").dropna()
+        n_b = len(values)
+        if not n_b:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    def std(self, ddof: int = 0) -> float:
+        if self.n - ddof <= 0:
+            return math.nan
+        return math.sqrt(self.m2 / (self.n - ddof))
+
+
+def column_stats(path: Path, column: str, chunksize: int = 100_000, **kwargs) -> RunningStats:
+    stats = RunningStats()
+    for chunk in read_chunks(path, chunksize=chunksize, usecols=[column], **kwargs):
+        stats.update(chunk[column])
+    return stats
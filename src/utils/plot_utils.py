@@ -1,10 +1,47 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+import time
 import matplotlib
+import numpy as np
 
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from config import logger, PLOT_WORKERS, PLOT_MAX_POINTS
+from src.utils.perf_utils import map_settled, timed
 
+# Up to this many charts are rendered in-process: starting a pool (and
+# importing matplotlib in every worker) costs more than it saves
+INLINE_MAX_SPECS = 2
 
-def save_lineplot(x, y, out_path, title="Temp", xlabel="", ylabel=""):
+
+def decimate_minmax(x, y, max_points: int = PLOT_MAX_POINTS):
+    # Keeps the min and max of each bucket (plus both ends), so peaks survive
+    # while the number of plotted points stays within max_points
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if not max_points or n <= max_points:
+        return x, y
+    x = np.asarray(x)
+    buckets = max(1, (max_points - 2) // 2)
+    # Buckets of ceil(n / buckets) points; the tail is padded with NaN so the
+    # last, partial bucket is covered too
+    size = -(-n // buckets)
+    body = np.full(size * buckets, np.nan)
+    body[:n] = y
+    body = body.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    imin = np.argmin(np.where(np.isnan(body), np.inf, body), axis=1) + offsets
+    imax = np.argmax(np.where(np.isnan(body), -np.inf, body), axis=1) + offsets
+    idx = np.unique(np.concatenate(([0, n - 1], imin, imax)))
+    idx = idx[idx < n]
+    return x[idx], y[idx]
+
+
+@timed()
+def save_lineplot(x, y, out_path, title="Temp", xlabel="", ylabel="", max_points: int = PLOT_MAX_POINTS):
+    x, y = decimate_minmax(x, y, max_points)
     fig, ax = plt.subplots()
     ax.plot(x, y)
     ax.set_title(title)
@@ -16,3 +53,106 @@ def save_lineplot(x, y, out_path, title="Temp", xlabel="", ylabel=""):
     fig.savefig(out_path, dpi=150)
     plt.close(fig)
     return out_path
+
+
+@dataclass
+class PlotSpec:
+    kind: str  # "line", "hist" or "count"
+    out_path: Path
+    data: object = None  # DataFrame for hist/count
+    x: object = None  # column name for hist/count, values for line
+    y: object = None
+    title: str = ""
+    xlabel: str = ""
+    ylabel: str = ""
+    options: dict = field(default_factory=dict)
+
+
+def _draw(ax, spec: PlotSpec) -> None:
+    if spec.kind == "line":
+        ax.plot(*decimate_minmax(spec.x, spec.y))
+        ax.grid(True, linestyle="--", alpha=0.4)
+    elif spec.kind == "hist":
+        import seaborn as sns
+        sns.histplot(data=spec.data, x=spec.x, ax=ax, **spec.options)
+    elif spec.kind == "count":
+        import seaborn as sns
+        sns.countplot(data=spec.data, x=spec.x, ax=ax, **spec.options)
+    else:
+        raise ValueError(f"Unknown plot kind: {spec.kind}")
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.xlabel)
+    ax.set_ylabel(spec.ylabel)
+
+
+def _is_numeric(values) -> bool:
+    try:
+        np.asarray(values, dtype=float)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _render_chunk(specs: list[PlotSpec], dpi: int) -> list[tuple[Path, float | Exception]]:
+    # One figure per worker, cleared between charts instead of re-created.
+    # Consecutive numeric line charts only swap the data of the same Line2D.
+    fig, ax = plt.subplots()
+    line = None
+    results = []
+    try:
+        for spec in specs:
+            start = time.perf_counter()
+            try:
+                if line is not None and spec.kind == "line" and _is_numeric(spec.x):
+                    line.set_data(*decimate_minmax(spec.x, spec.y))
+                    ax.relim()
+                    ax.autoscale_view()
+                    ax.set_title(spec.title)
+                    ax.set_xlabel(spec.xlabel)
+                    ax.set_ylabel(spec.ylabel)
+                else:
+                    ax.clear()
+                    _draw(ax, spec)
+                    numeric_line = spec.kind == "line" and _is_numeric(spec.x)
+                    line = ax.lines[0] if numeric_line and len(ax.lines) == 1 else None
+                fig.tight_layout()
+                spec.out_path.parent.mkdir(parents=True, exist_ok=True)
+                fig.savefig(spec.out_path, dpi=dpi)
+                results.append((spec.out_path, time.perf_counter() - start))
+            except Exception as e:
+                line = None
+                results.append((spec.out_path, e))
+    finally:
+        plt.close(fig)
+    return results
+
+
+def render_batch(specs: list[PlotSpec], workers: int = PLOT_WORKERS, dpi: int = 150) -> list[tuple[Path, float | Exception]]:
+    # Seconds per chart, or the exception; a chunk whose worker failed as a
+    # whole gives its exception for every chart in it
+    if not specs:
+        return []
+    workers = max(1, min(workers, len(specs)))
+    if len(specs) <= INLINE_MAX_SPECS:
+        workers = 1
+    start = time.perf_counter()
+    render = partial(_render_chunk, dpi=dpi)
+    if workers == 1:
+        results = render(specs)
+    else:
+        size = -(-len(specs) // workers)
+        chunks = [specs[i:i + size] for i in range(0, len(specs), size)]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            done = map_settled(render, chunks, ex)
+        results = [r for chunk, res in done
+                   for r in ([(s.out_path, res) for s in chunk] if isinstance(res, Exception) else res)]
+
+    elapsed = time.perf_counter() - start
+    for path, res in results:
+        if isinstance(res, Exception):
+            logger.error(f"Render failed for {path}: {res}", exc_info=res)
+        else:
+            logger.debug(f"Rendered {path} in {res * 1000:.0f} ms")
+    ok = sum(1 for _, r in results if not isinstance(r, Exception))
+    logger.info(f"Rendered {ok}/{len(specs)} charts in {elapsed:.2f}s with {workers} workers")
+    return results
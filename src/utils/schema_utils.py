@@ -0,0 +1,174 @@
+from dataclasses import dataclass, field
+from datetime import date
+import numpy as np
+import pandas as pd
+from config import logger
+
+# Shared alias table: canonical field -> lower-case header spellings seen in sources
+ALIASES = {
+    "date": {"date", "fecha", "trade_date"},
+    "product": {"product", "producto", "article"},
+    "price": {"price", "precio", "cost"},
+    "units": {"ud_vendidas", "sold_units", "sold_un", "unidades", "quantity", "cantidad", "uds", "qty"},
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y%m%d")
+# Non-null values a date format is checked against
+DATE_SAMPLE = 200
+
+
+@dataclass(frozen=True)
+class Column:
+    kind: str  # "label" (strip + upper, categorical if low-cardinality), "number" or "date"
+    aliases: frozenset
+    required: bool = True
+    default: object = None  # value, or callable, used when an optional column is absent
+
+
+@dataclass
+class Schema:
+    name: str
+    columns: dict[str, Column]
+    date_formats: tuple[str, ...] = DATE_FORMATS
+    category_max_ratio: float = 0.5
+
+
+@dataclass
+class Plan:
+    rename: dict[str, str]
+    missing: list[str]
+    # Last format detected per date column; checked against each new sample
+    date_formats: dict[str, str] = field(default_factory=dict)
+
+
+# Compiled plans per (schema, source header layout): repeat files skip alias
+# matching, and their date format is only re-detected when the cached one no
+# longer parses the sample
+_PLANS: dict[tuple[str, tuple[str, ...]], Plan] = {}
+
+
+def column(canonical: str, kind: str, required: bool = True, default=None) -> Column:
+    return Column(kind, frozenset(ALIASES[canonical]), required, default)
+
+
+def compile_plan(columns: list, schema: Schema) -> Plan:
+    lower_map = {}
+    for c in columns:
+        lower_map.setdefault(str(c).strip().lower(), c)
+    rename = {}
+    for target, spec in schema.columns.items():
+        for alias in [target] + sorted(spec.aliases - {target}):
+            if alias in lower_map:
+                rename[lower_map[alias]] = target
+                break
+    found = set(rename.values())
+    missing = [t for t, spec in schema.columns.items() if spec.required and t not in found]
+    return Plan(rename=rename, missing=missing)
+
+
+def get_plan(columns: list, schema: Schema) -> Plan:
+    key = (schema.name, tuple(str(c) for c in columns))
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = compile_plan(columns, schema)
+        logger.debug(f"Compiled {schema.name} plan for layout {key[1]}")
+    return plan
+
+
+SALES_ES = Schema("sales_es", {
+    "fecha": column("date", "date", required=False, default=lambda: date.today().isoformat()),
+    "producto": column("product", "label"),
+    "precio": column("price", "number"),
+    "ud_vendidas": column("units", "number"),
+})
+
+SALES_EN = Schema("sales_en", {
+    "date": column("date", "date"),
+    "product": column("product", "label"),
+    "price": column("price", "number"),
+    "sold_units": column("units", "number"),
+})
+
+
+def _date_sample(values: pd.Series, sample: int = DATE_SAMPLE) -> pd.Series:
+    return values.dropna().astype(str).head(sample)
+
+
+def _parses_all(head: pd.Series, fmt: str) -> bool:
+    return bool(pd.to_datetime(head, format=fmt, errors="coerce").notna().all())
+
+
+def detect_date_format(values: pd.Series, formats: tuple[str, ...], sample: int = DATE_SAMPLE) -> str | None:
+    # Only a format that parses every sampled value is used; anything less
+    # (mixed layouts, dates next to datetimes) goes through format="mixed"
+    head = _date_sample(values, sample)
+    if head.empty:
+        return None
+    for fmt in formats:
+        if _parses_all(head, fmt):
+            return fmt
+    return None
+
+
+def plan_date_format(plan: Plan, target: str, values: pd.Series, formats: tuple[str, ...]) -> str | None:
+    # The cached format is kept while it parses the whole sample; files that
+    # share a header layout but not a date layout trigger a fresh detection
+    cached = plan.date_formats.get(target)
+    if cached is not None:
+        head = _date_sample(values)
+        if head.empty or _parses_all(head, cached):
+            return cached
+    fmt = detect_date_format(values, formats)
+    if fmt is None:
+        plan.date_formats.pop(target, None)
+    else:
+        plan.date_formats[target] = fmt
+    return fmt
+
+
+def to_label(values: pd.Series, max_ratio: float) -> pd.Series:
+    # String work happens once per distinct value, not once per row
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return pd.Series(np.nan, index=values.index, dtype=object)
+    labels = pd.Index(uniques).astype(str).str.strip().str.upper()
+    categories = np.sort(labels.unique())
+    remap = np.searchsorted(categories, labels)
+    new_codes = np.where(codes >= 0, remap[codes], -1)
+    cat = pd.Categorical.from_codes(new_codes, categories=categories)
+    if len(categories) <= max_ratio * len(values):
+        return pd.Series(cat, index=values.index)
+    return pd.Series(np.asarray(cat, dtype=object), index=values.index)
+
+
+def to_date(values: pd.Series, fmt: str | None) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if fmt is None:
+        return pd.to_datetime(values, errors="coerce", format="mixed")
+    return pd.to_datetime(values.astype(str), format=fmt, errors="coerce")
+
+
+def normalize(df: pd.DataFrame, schema: Schema) -> pd.DataFrame:
+    plan = get_plan(list(df.columns), schema)
+    if plan.missing:
+        raise ValueError(f"Missing required columns for {schema.name}: {plan.missing}")
+    df = df.rename(columns=plan.rename)
+
+    out = {}
+    for target, spec in schema.columns.items():
+        if target in df.columns:
+            values = df[target]
+        else:
+            default = spec.default() if callable(spec.default) else spec.default
+            values = pd.Series(default, index=df.index)
+
+        if spec.kind == "label":
+            out[target] = to_label(values, schema.category_max_ratio)
+        elif spec.kind == "number":
+            out[target] = pd.to_numeric(values, errors="coerce")
+        elif spec.kind == "date":
+            out[target] = to_date(values, plan_date_format(plan, target, values, schema.date_formats))
+        else:
+            raise ValueError(f"Unknown column kind: {spec.kind}")
+    return pd.DataFrame(out, index=df.index)
@@ -0,0 +1,95 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import inspect
+import pandas as pd
+from config import logger, DOWNLOAD_WORKERS, HTTP_CACHE, SCRAPE_PARSE_WORKERS, SCRAPE_MAX_PENDING
+from src.utils.perf_utils import settle
+from src.utils.web_utils import get_html
+from src.utils.table_utils import extract_table
+
+
+def parse_table(html: str, table_id: str | None = None) -> pd.DataFrame:
+    df = extract_table(html, table_id=table_id)
+    if df.empty:
+        raise ValueError("No valid rows in table")
+    return df
+
+
+async def _run_sink(sink, url: str, df: pd.DataFrame, pool: Executor) -> None:
+    # Async sinks are awaited; plain callables run on a single worker thread
+    # (one call at a time), so a slow sink never blocks the event loop
+    if inspect.iscoroutinefunction(sink):
+        await sink(url, df)
+        return
+    result = await asyncio.get_running_loop().run_in_executor(pool, sink, url, df)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def scrape_tables(urls: list[str], table_id: str | None = None, sink=None, fallback_html: str | None = None,
+                        concurrency: int = DOWNLOAD_WORKERS, parse_workers: int = SCRAPE_PARSE_WORKERS,
+                        max_pending: int = SCRAPE_MAX_PENDING, timeout: int = 30,
+                        use_cache: bool = HTTP_CACHE) -> list[tuple[str, pd.DataFrame | Exception, str | None]]:
+    # Fetches run on threads (at most `concurrency` at once) and hand pages to
+    # parser processes through a bounded queue: when parsing falls behind, the
+    # queue fills and fetchers wait while still holding their slot, so no new
+    # downloads start. Each frame goes to `sink(url, df)` as soon as it is
+    # parsed. Each URL ends as (url, df | exception, "web" | "fallback" | None),
+    # collected in order by perf_utils.settle.
+    loop = asyncio.get_running_loop()
+    outcomes = [loop.create_future() for _ in urls]
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+    slots = asyncio.BoundedSemaphore(max(1, concurrency))
+    parse_workers = max(0, min(parse_workers, len(urls)))
+
+    async def fetch(i: int, url: str) -> None:
+        async with slots:
+            try:
+                html = await loop.run_in_executor(fetch_pool, partial(get_html, url, timeout=timeout, use_cache=use_cache))
+                await queue.put((i, url, html, None))
+            except Exception as e:
+                await queue.put((i, url, None, e))
+
+    async def parse_one(pool: Executor | None, url: str, html: str | None, error: Exception | None):
+        try:
+            if error is not None:
+                raise error
+            return await loop.run_in_executor(pool, parse_table, html, table_id), "web"
+        except Exception as e:
+            if fallback_html is None:
+                raise
+            logger.warning(f"Fail scrapping {url}: {e}. Using fallback HTML")
+            return await loop.run_in_executor(pool, parse_table, fallback_html, table_id), "fallback"
+
+    async def parse(pool: Executor | None) -> None:
+        # A failure is recorded for its URL; the worker keeps draining the queue
+        while (item := await queue.get()) is not None:
+            i, url, html, error = item
+            try:
+                df, source = await parse_one(pool, url, html, error)
+                logger.info(f"Table from {url} ({source}) with {len(df)} rows")
+                if sink is not None:
+                    await _run_sink(sink, url, df, sink_pool)
+                outcomes[i].set_result((df, source))
+            except Exception as e:
+                logger.error(f"Scrape failed for {url}: {e}")
+                outcomes[i].set_exception(e)
+
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 1 else None
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as fetch_pool, \
+            ThreadPoolExecutor(max_workers=1) as sink_pool:
+        try:
+            parsers = [asyncio.create_task(parse(parse_pool)) for _ in range(max(1, parse_workers))]
+            await asyncio.gather(*(fetch(i, url) for i, url in enumerate(urls)))
+            for _ in parsers:
+                await queue.put(None)
+            await asyncio.gather(*parsers)
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(cancel_futures=True)
+    return [(url, res, None) if isinstance(res, Exception) else (url, *res) for url, res in settle(urls, outcomes)]
+
+
+def scrape_many(urls: list[str], **kwargs) -> list[tuple[str, pd.DataFrame | Exception, str | None]]:
+    return asyncio.run(scrape_tables(urls, **kwargs))
@@ -0,0 +1,232 @@
+from html.parser import HTMLParser
+from io import StringIO
+import pandas as pd
+from config import logger
+
+# A raw row is a list of (text, colspan, rowspan) cells
+Cell = tuple[str, int, int]
+
+
+def _span(value) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def expand_spans(rows: list[list[Cell]]) -> list[list[str | None]]:
+    grid = []
+    pending = {}  # column -> (rows left, text) carried down by rowspan
+    for row in rows:
+        out = []
+        col = 0
+        cells = iter(row)
+        cell = next(cells, None)
+        while cell is not None or any(c >= col for c in pending):
+            if col in pending:
+                left, text = pending[col]
+                out.append(text)
+                if left > 1:
+                    pending[col] = (left - 1, text)
+                else:
+                    del pending[col]
+                col += 1
+                continue
+            if cell is None:
+                out.append(None)
+                col += 1
+                continue
+            text, colspan, rowspan = cell
+            for _ in range(colspan):
+                out.append(text)
+                if rowspan > 1:
+                    pending[col] = (rowspan - 1, text)
+                col += 1
+            cell = next(cells, None)
+        grid.append(out)
+    return grid
+
+
+def rows_to_frame(header_rows: list[list[Cell]], body_rows: list[list[Cell]]) -> pd.DataFrame:
+    if not header_rows and not body_rows:
+        return pd.DataFrame()
+    if not header_rows:
+        header_rows, body_rows = body_rows[:1], body_rows[1:]
+
+    grid = expand_spans(header_rows + body_rows)
+    head, body = grid[:len(header_rows)], grid[len(header_rows):]
+
+    width = max(len(r) for r in head)
+    headers = []
+    for i in range(width):
+        parts = []
+        for r in head:
+            text = r[i] if i < len(r) else None
+            if text and text not in parts:
+                parts.append(text)
+        headers.append(" ".join(parts) or f"col_{i}")
+
+    data = []
+    for values in body:
+        if not any(v is not None for v in values):
+            continue
+        if len(values) < width:
+            values = values + [None] * (width - len(values))
+        data.append(values[:width])
+    return pd.DataFrame(data, columns=headers)
+
+
+def bs4_table_to_df(table_tag) -> pd.DataFrame:
+    header_rows, body_rows = [], []
+    for tr in table_tag.find_all("tr"):
+        cells = [(c.get_text(strip=True), _span(c.get("colspan")), _span(c.get("rowspan")))
+                 for c in tr.find_all(["td", "th"])]
+        if not cells:
+            continue
+        (header_rows if tr.parent.name == "thead" else body_rows).append(cells)
+    return rows_to_frame(header_rows, body_rows)
+
+
+class _TableParser(HTMLParser):
+    # Single pass over the markup; no element tree is built. Row, cell and
+    # section state live on each open table, so a table nested in a cell
+    # does not steal the outer table's row. Tables are listed in document order
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            table = {"id": dict(attrs).get("id"), "head": [], "body": [], "row": None, "cell": None, "section": None}
+            self.tables.append(table)
+            self._stack.append(table)
+            return
+        if not self._stack:
+            return
+        t = self._stack[-1]
+        if tag in ("thead", "tbody", "tfoot"):
+            t["section"] = tag
+        elif tag == "tr":
+            self._close_row(t)
+            t["row"] = []
+        elif tag in ("td", "th"):
+            self._close_cell(t)
+            if t["row"] is None:
+                t["row"] = []
+            a = dict(attrs)
+            t["cell"] = ([], _span(a.get("colspan")), _span(a.get("rowspan")))
+
+    def handle_endtag(self, tag):
+        if not self._stack:
+            return
+        t = self._stack[-1]
+        if tag in ("td", "th"):
+            self._close_cell(t)
+        elif tag == "tr":
+            self._close_row(t)
+        elif tag in ("thead", "tbody", "tfoot"):
+            self._close_row(t)
+            t["section"] = None
+        elif tag == "table":
+            self._close_row(t)
+            self._stack.pop()
+
+    def handle_data(self, data):
+        if self._stack and self._stack[-1]["cell"] is not None:
+            text = data.strip()
+            if text:
+                self._stack[-1]["cell"][0].append(text)
+
+    def close(self):
+        # Tables left open by truncated markup keep the rows read so far
+        super().close()
+        while self._stack:
+            self._close_row(self._stack.pop())
+
+    @staticmethod
+    def _close_cell(t: dict):
+        if t["cell"] is not None and t["row"] is not None:
+            parts, colspan, rowspan = t["cell"]
+            t["row"].append(("".join(parts), colspan, rowspan))
+        t["cell"] = None
+
+    def _close_row(self, t: dict):
+        self._close_cell(t)
+        if t["row"]:
+            t["head" if t["section"] == "thead" else "body"].append(t["row"])
+        t["row"] = None
+
+
+def _extract_stream(html: str, table_id: str | None) -> list[pd.DataFrame]:
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    tables = parser.tables
+    if table_id is not None:
+        tables = [t for t in tables if t["id"] == table_id]
+    return [rows_to_frame(t["head"], t["body"]) for t in tables]
+
+
+def _flat_header(column, i: int) -> str:
+    # Same naming as rows_to_frame: distinct header texts joined by spaces
+    parts = []
+    for text in column if isinstance(column, tuple) else (column,):
+        text = str(text)
+        if text and not text.startswith("Unnamed:") and text not in parts:
+            parts.append(text)
+    return " ".join(parts) or f"col_{i}"
+
+
+def _extract_lxml(html: str, table_id: str | None) -> list[pd.DataFrame]:
+    attrs = {"id": table_id} if table_id is not None else None
+    tables = pd.read_html(StringIO(html), attrs=attrs, flavor="lxml")
+    for df in tables:
+        df.columns = [_flat_header(c, i) for i, c in enumerate(df.columns)]
+    return tables
+
+
+def _extract_bs4(html: str, table_id: str | None) -> list[pd.DataFrame]:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    tables = soup.find_all("table", id=table_id) if table_id is not None else soup.find_all("table")
+    return [bs4_table_to_df(t) for t in tables]
+
+
+ENGINES = {"lxml": _extract_lxml, "stream": _extract_stream, "bs4": _extract_bs4}
+
+
+def extract_tables(html: str, table_id: str | None = None, engine: str = "auto") -> list[pd.DataFrame]:
+    """Tables in `html` (only the one with `table_id` when given).
+
+    "auto" uses the stream parser, falling back to bs4: both return flat
+    headers (multi-row <thead> texts joined by spaces) and cell values as
+    strings, so the schema never depends on what is installed. "lxml"
+    (pd.read_html) is faster but must be asked for explicitly: its headers
+    are flattened the same way, but pandas converts the values ("007" -> 7,
+    "" -> NaN).
+    """
+    if engine == "auto":
+        order = ["stream", "bs4"]
+    else:
+        order = [engine]
+    for name in order:
+        try:
+            return ENGINES[name](html, table_id)
+        except ValueError as e:
+            # pd.read_html raises ValueError when nothing matches
+            if name == "lxml" and "No tables found" in str(e):
+                return []
+            logger.warning(f"Table extraction with {name} failed: {e}")
+        except Exception as e:
+            logger.warning(f"Table extraction with {name} failed: {e}")
+    return []
+
+
+def extract_table(html: str, table_id: str | None = None, engine: str = "auto") -> pd.DataFrame:
+    tables = extract_tables(html, table_id=table_id, engine=engine)
+    if not tables and table_id is not None:
+        tables = extract_tables(html, engine=engine)
+    if not tables:
+        raise ValueError("No table found")
+    return tables[0]
@@ -1,27 +1,526 @@
+from __future__ import annotations
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import struct
+import threading
+import time
+import zlib
 import requests
-from config import logger
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as TransportError
+from config import (logger, DOWNLOAD_WORKERS, DOWNLOAD_PER_HOST, DOWNLOAD_RETRIES,
+                    HTTP_CACHE, HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES, HTML_PARSER)
+from src.utils.perf_utils import map_settled, timed
 
+HEADERS = {"User-Agent": "python-lab/1.0"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Bounds for the adaptive read size of streamed downloads
+MIN_CHUNK = 8 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
 
-def download_file(url: str, dest: Path, timeout: int = 30, chunk_size: int = 8192) -> Path:
+_session = None
+_session_lock = threading.Lock()
+_url_locks: dict[str, threading.Lock] = {}
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers.update(HEADERS)
+            _session = s
+        return _session
+
+
+def html_parser() -> str:
+    if HTML_PARSER != "auto":
+        return HTML_PARSER
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+def make_soup(markup: str | bytes) -> BeautifulSoup:
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, html_parser())
+
+
+def _url_lock(url: str) -> threading.Lock:
+    # One download per URL at a time within the process, so two threads never share a .part file
+    with _session_lock:
+        return _url_locks.setdefault(url, threading.Lock())
+
+
+def _cache_entry(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return HTTP_CACHE_DIR / f"{key}.body", HTTP_CACHE_DIR / f"{key}.json"
+
+
+def cached_fetch(url: str, timeout: int = 30, ttl: int = HTTP_CACHE_TTL, chunk_size: int = 65536) -> tuple[Path, dict]:
+    # Serves fresh entries from disk, revalidates stale ones with ETag /
+    # Last-Modified and only downloads the body again when it changed
+    body_path, meta_path = _cache_entry(url)
+    meta = None
+    if body_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if time.time() - meta.get("fetched_at", 0) < ttl:
+            os.utime(body_path)
+            logger.info(f"HTTP cache hit: {url}")
+            return body_path, meta
+
+    headers = _conditional_headers({**meta, "path": str(body_path)}) if meta else {}
+    with _url_lock(url):
+        resp_headers = stream_download(url, body_path, headers=headers, timeout=timeout, chunk_size=chunk_size)
+    if resp_headers is None and meta:
+        logger.info(f"HTTP cache revalidated: {url}")
+    else:
+        meta = {
+            "url": url,
+            "etag": resp_headers.get("ETag"),
+            "last_modified": resp_headers.get("Last-Modified"),
+            "content_type": resp_headers.get("Content-Type", ""),
+        }
+
+    meta["fetched_at"] = time.time()
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    os.utime(body_path)
+    evict_http_cache(HTTP_CACHE_MAX_BYTES, keep=body_path)
+    return body_path, meta
+
+
+def evict_http_cache(max_bytes: int, keep: Path | None = None) -> int:
+    # Least recently used first, but entries that alone exceed the budget go
+    # before anything else. `keep` is the entry about to be served: it is never
+    # evicted, and when it is oversized it does not count against the others
+    entries = []
+    for p in HTTP_CACHE_DIR.glob("*.body"):
+        if p == keep:
+            continue
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(size for _, size, _ in entries)
+    if keep is not None and keep.exists() and keep.stat().st_size <= max_bytes:
+        total += keep.stat().st_size
+    removed = 0
+    for _, size, p in sorted(entries, key=lambda e: (e[1] <= max_bytes, e[0])):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        p.with_suffix(".json").unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"HTTP cache evicted {removed} entries ({total} bytes kept)")
+    return removed
+
+
+@timed()
+def download_file(url: str, dest: Path, timeout: int = 30, chunk_size: int = 65536,
+                  use_cache: bool = False, checksum: str | None = None) -> Path:
+    # checksum: "sha256:<hex>" (any hashlib algorithm), verified while the bytes
+    # stream straight into dest. With use_cache the body goes through the HTTP
+    # cache and is copied (and verified) from there: a second pass over the file
     logger.info(f"Downloading: {url}")
     dest.parent.mkdir(parents=True, exist_ok=True)
-    with requests.get(url, stream=True, timeout=timeout, headers={"User-Agent": "python-lab/1.0"}) as r:
-        r.raise_for_status()
-        ctype = r.headers.get("Content-Type", "")
-        if "text" not in ctype and "csv" not in ctype:
-            logger.warning(f"Unexpected Content-Type: {ctype}")
-        with open(dest, "wb") as f:
-            for chunk in r.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
+    if use_cache:
+        body_path, meta = cached_fetch(url, timeout=timeout)
+        ctype = meta.get("content_type", "")
+        _copy_verified(body_path, dest, checksum)
+    else:
+        resp_headers = stream_download(url, dest, timeout=timeout, chunk_size=chunk_size, checksum=checksum)
+        ctype = resp_headers.get("Content-Type", "")
+    if "text" not in ctype and "csv" not in ctype:
+        logger.warning(f"Unexpected Content-Type: {ctype}")
     logger.info(f"File saved in {dest}")
     return dest
 
 
-def get_soup(url: str, timeout: int = 30) -> BeautifulSoup:
+def get_html(url: str, timeout: int = 30, use_cache: bool = HTTP_CACHE) -> str:
     logger.info(f"HTML: {url}")
-    resp = requests.get(url, timeout=timeout, headers={"User-Agent": "python-lab/1.0"})
+    if use_cache:
+        body_path, _ = cached_fetch(url, timeout=timeout)
+        from bs4 import UnicodeDammit
+        return UnicodeDammit(body_path.read_bytes(), is_html=True).unicode_markup
+    resp = requests.get(url, timeout=timeout, headers=HEADERS)
     resp.raise_for_status()
-    return BeautifulSoup(resp.text, "html.parser")
\ No newline at end of file
+    return resp.text
+
+
+@timed()
+def get_soup(url: str, timeout: int = 30, use_cache: bool = HTTP_CACHE) -> BeautifulSoup:
+    logger.info(f"HTML: {url}")
+    if use_cache:
+        body_path, _ = cached_fetch(url, timeout=timeout)
+        return make_soup(body_path.read_bytes())
+    resp = requests.get(url, timeout=timeout, headers=HEADERS)
+    resp.raise_for_status()
+    return make_soup(resp.text)
+
+
+class ValidatorStore:
+    # ETag / Last-Modified per URL, persisted as JSON next to the downloads
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def get(self, url: str) -> dict:
+        with self._lock:
+            return dict(self._data.get(url, {}))
+
+    def set(self, url: str, entry: dict) -> None:
+        with self._lock:
+            self._data[url] = entry
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._data, indent=2), encoding="utf-8")
+
+
+def _conditional_headers(entry: dict) -> dict:
+    if not entry or not Path(entry.get("path", "")).exists():
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _hasher(checksum: str | None):
+    # "sha256:<hex>" -> (hash object, expected hex); a bare hex digest means sha256
+    if not checksum:
+        return None, None
+    algo, _, expected = checksum.partition(":")
+    if not expected:
+        algo, expected = "sha256", algo
+    return hashlib.new(algo.lower()), expected.lower()
+
+
+def _check_digest(hasher, expected: str | None, url: str) -> None:
+    if hasher is not None and hasher.hexdigest() != expected:
+        raise ValueError(f"Checksum mismatch for {url}: expected {expected}, got {hasher.hexdigest()}")
+
+
+def _copy_verified(src: Path, dest: Path, checksum: str | None, chunk_size: int = 1 << 20) -> None:
+    hasher, expected = _hasher(checksum)
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            while chunk := fin.read(chunk_size):
+                fout.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+        _check_digest(hasher, expected, str(src))
+        tmp.replace(dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _partial_paths(dest: Path) -> tuple[Path, Path]:
+    part = dest.with_name(dest.name + ".part")
+    return part, part.with_name(part.name + ".json")
+
+
+def _discard_partial(part: Path, part_meta: Path) -> None:
+    part.unlink(missing_ok=True)
+    part_meta.unlink(missing_ok=True)
+
+
+def _resume_headers(url: str, part: Path, part_meta: Path) -> tuple[int, dict]:
+    # A .part is only resumed when the server gave a validator for it, sent back
+    # as If-Range: if the resource changed meanwhile the server answers 200 with
+    # the full body instead of 206 with the rest
+    if not part.exists() or not part_meta.exists():
+        return 0, {}
+    meta = json.loads(part_meta.read_text(encoding="utf-8"))
+    etag = meta.get("etag")
+    validator = etag if etag and not etag.startswith("W/") else meta.get("last_modified")
+    offset = part.stat().st_size
+    if meta.get("url") != url or not validator or not offset:
+        return 0, {}
+    return offset, {"Range": f"bytes={offset}-", "If-Range": validator}
+
+
+def _range_start(r: requests.Response) -> int | None:
+    # "Content-Range: bytes 100-199/200" -> 100
+    unit, _, spec = r.headers.get("Content-Range", "").partition(" ")
+    start = spec.split("-", 1)[0]
+    return int(start) if unit == "bytes" and start.isdigit() else None
+
+
+def _stream_body(r: requests.Response, f, hasher, chunk_size: int) -> int:
+    # The read size follows throughput: doubled while reads come back within
+    # 0.1 s, halved when one takes over 1 s (slow links keep small reads)
+    written = 0
+    while True:
+        start = time.perf_counter()
+        chunk = r.raw.read(chunk_size, decode_content=True)
+        if not chunk:
+            return written
+        f.write(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+        written += len(chunk)
+        elapsed = time.perf_counter() - start
+        if elapsed < 0.1:
+            chunk_size = min(chunk_size * 2, MAX_CHUNK)
+        elif elapsed > 1.0:
+            chunk_size = max(chunk_size // 2, MIN_CHUNK)
+
+
+def stream_download(url: str, dest: Path, headers: dict | None = None, timeout: int = 30,
+                    chunk_size: int = 65536, checksum: str | None = None, retries: int = DOWNLOAD_RETRIES,
+                    backoff: float = 0.5):
+    # Streams into <dest>.part and renames it over dest once complete and
+    # verified, so dest is never left truncated. A transfer cut short (in this
+    # call or a previous run) continues from the .part size with a Range
+    # request. Returns the response headers, or None on 304 Not Modified.
+    part, part_meta = _partial_paths(dest)
+    session = get_session()
+    for attempt in range(retries + 1):
+        offset, resume = _resume_headers(url, part, part_meta)
+        request_headers = {**(headers or {}), **resume, "Accept-Encoding": "identity"}
+        try:
+            with session.get(url, stream=True, timeout=timeout, headers=request_headers) as r:
+                if r.status_code == 304:
+                    return None
+                if r.status_code == 416 and offset:
+                    logger.warning(f"Discarding stale partial download of {url}")
+                    _discard_partial(part, part_meta)
+                    return stream_download(url, dest, headers, timeout, chunk_size, checksum, retries, backoff)
+                if r.status_code in RETRY_STATUS and attempt < retries:
+                    raise requests.HTTPError(f"{r.status_code} for {url}", response=r)
+                r.raise_for_status()
+
+                resumed = r.status_code == 206 and offset > 0
+                if resumed and _range_start(r) != offset:
+                    _discard_partial(part, part_meta)
+                    raise requests.HTTPError(f"Unexpected Content-Range for {url}", response=r)
+                hasher, expected = _hasher(checksum)
+                if resumed:
+                    logger.info(f"Resuming {url} at {offset} bytes")
+                    if hasher is not None:
+                        # The bytes already on disk are hashed once so the digest covers the whole file
+                        with open(part, "rb") as f:
+                            while block := f.read(1 << 20):
+                                hasher.update(block)
+
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                part_meta.write_text(json.dumps({
+                    "url": url,
+                    "etag": r.headers.get("ETag"),
+                    "last_modified": r.headers.get("Last-Modified"),
+                }), encoding="utf-8")
+                with open(part, "ab" if resumed else "wb") as f:
+                    _stream_body(r, f, hasher, chunk_size)
+                try:
+                    _check_digest(hasher, expected, url)
+                except ValueError:
+                    _discard_partial(part, part_meta)
+                    raise
+                part.replace(dest)
+                part_meta.unlink(missing_ok=True)
+                return r.headers
+        except (requests.RequestException, TransportError) as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if attempt >= retries or (status is not None and status not in RETRY_STATUS and status != 206):
+                raise
+            wait = backoff * 2 ** attempt
+            logger.warning(f"Retry {attempt + 1}/{retries} for {url} in {wait:.1f}s: {e}")
+            time.sleep(wait)
+
+
+def fetch_to_file(url: str, dest: Path, validators: ValidatorStore | None = None, timeout: int = 30,
+                  chunk_size: int = 65536, retries: int = DOWNLOAD_RETRIES, backoff: float = 0.5,
+                  checksum: str | None = None) -> Path | None:
+    # Returns the written path, or None when the server answered 304 Not Modified
+    entry = validators.get(url) if validators else {}
+    resp_headers = stream_download(url, dest, headers=_conditional_headers(entry), timeout=timeout,
+                                   chunk_size=chunk_size, checksum=checksum, retries=retries, backoff=backoff)
+    if resp_headers is None:
+        logger.info(f"Not modified: {url}")
+        return None
+    if validators is not None:
+        validators.set(url, {
+            "etag": resp_headers.get("ETag"),
+            "last_modified": resp_headers.get("Last-Modified"),
+            "path": str(dest),
+        })
+    logger.info(f"File saved in {dest}")
+    return dest
+
+
+def download_many(jobs: list[tuple[str, Path]], validators: ValidatorStore | None = None,
+                  workers: int = DOWNLOAD_WORKERS, per_host: int = DOWNLOAD_PER_HOST,
+                  **kwargs) -> list[tuple[str, Path | None | Exception]]:
+    # A failed download yields its exception (see perf_utils.settle)
+    host_limits = {}
+    for url, _ in jobs:
+        host = urlparse(url).netloc
+        host_limits.setdefault(host, threading.BoundedSemaphore(per_host))
+
+    def run(job: tuple[str, Path]):
+        url, dest = job
+        with host_limits[urlparse(url).netloc]:
+            return fetch_to_file(url, dest, validators=validators, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        results = map_settled(run, jobs, ex, key=lambda job: job[0])
+    if validators is not None:
+        validators.save()
+    return results
+
+
+class _TeeReader(io.RawIOBase):
+    # Passes the response bytes through and copies them to <tee>.part; the
+    # copy replaces `tee` only if the stream was read to the end
+    def __init__(self, raw, tee: Path | None):
+        self.raw = raw
+        self.tee = tee
+        self.part = tee.with_name(tee.name + ".part") if tee else None
+        self.out = None
+        self.done = False
+        if self.part:
+            self.part.parent.mkdir(parents=True, exist_ok=True)
+            self.out = open(self.part, "wb")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer), decode_content=True)
+        if not data:
+            self.done = True
+            return 0
+        if self.out:
+            self.out.write(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def finish(self) -> None:
+        if not self.out:
+            return
+        self.out.close()
+        if self.done:
+            self.part.replace(self.tee)
+            logger.info(f"Archived download in {self.tee}")
+        else:
+            self.part.unlink(missing_ok=True)
+
+
+class _ZipMemberReader(io.RawIOBase):
+    # Inflates the first member of a zip archive straight from its local file
+    # header, so the archive never needs to be seekable or on disk
+    def __init__(self, fileobj):
+        header = fileobj.read(30)
+        sig, _, flags, method, _, _, _, size, _, name_len, extra_len = struct.unpack("<IHHHHHIIIHH", header)
+        if sig != 0x04034B50:
+            raise ValueError("Not a zip archive")
+        if method not in (0, 8) or (method == 0 and flags & 0x08):
+            raise ValueError(f"Unsupported zip member (method {method}, flags {flags:#x})")
+        fileobj.read(name_len + extra_len)
+        self.fileobj = fileobj
+        self.inflate = zlib.decompressobj(-zlib.MAX_WBITS) if method == 8 else None
+        self.remaining = size  # only used for stored members
+        self.pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            if self.inflate is None:
+                if self.remaining <= 0:
+                    return 0
+                self.pending = self.fileobj.read(min(len(buffer), self.remaining))
+                self.remaining -= len(self.pending)
+                if not self.pending:
+                    return 0
+            else:
+                if self.inflate.eof:
+                    return 0
+                data = self.fileobj.read(65536)
+                if not data:
+                    return 0
+                self.pending = self.inflate.decompress(data)
+        n = min(len(buffer), len(self.pending))
+        buffer[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+
+def _decompressed(stream: io.BufferedReader, compression: str | None, url: str):
+    # "infer" sniffs the magic bytes (the URL suffix is often missing or wrong)
+    if compression == "infer":
+        magic = stream.peek(4)[:4]
+        if magic[:2] == b"\x1f\x8b":
+            compression = "gzip"
+        elif magic == b"PK\x03\x04":
+            compression = "zip"
+        else:
+            compression = None
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=stream)
+    if compression == "zip":
+        return io.BufferedReader(_ZipMemberReader(stream))
+    if compression is not None:
+        raise ValueError(f"Unsupported compression for {url}: {compression}")
+    return stream
+
+
+@contextmanager
+def open_stream(url: str, tee: Path | None = None, compression: str | None = "infer", timeout: int = 30):
+    # Binary file-like over the response body: content-encoding is undone by
+    # urllib3, gzip/zip payloads are inflated on the fly, and the received
+    # bytes are optionally archived to `tee` in the same pass
+    with get_session().get(url, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        reader = _TeeReader(r.raw, tee)
+        try:
+            yield _decompressed(io.BufferedReader(reader, buffer_size=1 << 16), compression, url)
+            if tee:
+                # Whatever the parser left unread still belongs in the archive
+                while reader.read(1 << 16):
+                    pass
+        finally:
+            reader.finish()
+
+
+def _iter_frames(url: str, chunksize: int, tee: Path | None, compression: str | None, timeout: int, kwargs: dict):
+    import pandas as pd
+
+    with open_stream(url, tee=tee, compression=compression, timeout=timeout) as stream:
+        with pd.read_csv(stream, chunksize=chunksize, **kwargs) as chunks:
+            yield from chunks
+
+
+@timed()
+def fetch_dataframe(url: str, chunksize: int | None = None, tee: Path | None = None,
+                    compression: str | None = "infer", timeout: int = 30, **kwargs):
+    # CSV parsed straight from the response: a DataFrame, or an iterator of
+    # DataFrames when chunksize is given. No temporary file is written; `tee`
+    # keeps a copy of the downloaded bytes
+    logger.info(f"Streaming: {url}")
+    if chunksize:
+        return _iter_frames(url, chunksize, tee, compression, timeout, kwargs)
+    import pandas as pd
+
+    with open_stream(url, tee=tee, compression=compression, timeout=timeout) as stream:
+        return pd.read_csv(stream, **kwargs)
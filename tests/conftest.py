@@ -0,0 +1,61 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import tempfile
+import threading
+import pytest
+
+# Set before config is imported, so test runs never write to the repo's logs/
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="python_lab_logs_"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Serves `server.pages` ({path: (status, headers, body)}) or a callable
+    # `(handler) -> (status, headers, body)` for the per-request cases
+    def do_GET(self):
+        page = self.server.pages.get(self.path, (404, {}, b"not found"))
+        status, headers, body = page(self) if callable(page) else page
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _static_page(seen: list, body: bytes, etag: str, content_range: bool = True):
+    # Answers like a static file server: 304 on a matching If-None-Match, 206
+    # for a Range whose If-Range still matches, otherwise 200 with the full body.
+    # The request headers are appended to `seen`
+    def page(handler):
+        seen.append(dict(handler.headers))
+        headers = {"ETag": etag}
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, headers, b""
+        rng = handler.headers.get("Range")
+        if rng and handler.headers.get("If-Range", etag) == etag:
+            start = int(rng.removeprefix("bytes=").split("-")[0])
+            if content_range:
+                headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            return 206, headers, body[start:]
+        return 200, headers, body
+    return page
+
+
+@pytest.fixture
+def static_page():
+    return _static_page
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.pages = {}
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.utils import backup_utils
+from src.utils.backup_utils import list_snapshots, prune, restore, select_retained, snapshot
+
+START = datetime(2025, 9, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Snapshot names have one-second resolution; each snapshot gets its own minute
+    times = iter(START + timedelta(minutes=i) for i in range(100))
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return next(times)
+
+    monkeypatch.setattr(backup_utils, "datetime", Clock)
+
+
+def _write(root, name, values):
+    root.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"v": values}).to_parquet(root / name)
+
+
+def _read(root):
+    return {p.name: pd.read_parquet(p)["v"].tolist() for p in sorted(root.glob("*.parquet"))}
+
+
+def test_same_day_runs_stay_restorable(tmp_path, clock):
+    root, backups = tmp_path / "ledger", tmp_path / "backups"
+    _write(root, "a.parquet", [1])
+    states = []
+    for run in range(3):
+        states.append(_read(root))
+        snapshot(root, backups)
+        prune(backups, keep_daily=7, keep_weekly=4, keep_last=5)
+        _write(root, "a.parquet", [1] * (run + 2))
+
+    snaps = list_snapshots(backups)
+    assert len(snaps) == 3
+    for snap, state in zip(snaps, states):
+        restore(backups, root, as_of=backup_utils._snapshot_time(snap))
+        assert _read(root) == state
+
+
+def test_prune_drops_unreferenced_objects(tmp_path, clock):
+    root, backups = tmp_path / "ledger", tmp_path / "backups"
+    for values in ([1], [2], [3]):
+        _write(root, "a.parquet", values)
+        snapshot(root, backups)
+
+    assert prune(backups, keep_daily=1, keep_weekly=0) == 2
+    assert len(list_snapshots(backups)) == 1
+    assert len(list((backups / "objects").glob("*.parquet"))) == 1
+    _write(root, "a.parquet", [9])
+    restore(backups, root)
+    assert _read(root) == {"a.parquet": [3]}
+
+
+def test_unchanged_partitions_are_stored_once(tmp_path, clock):
+    root, backups = tmp_path / "ledger", tmp_path / "backups"
+    _write(root, "a.parquet", [1])
+    _write(root, "b.parquet", [2])
+    snapshot(root, backups)
+    _write(root, "b.parquet", [3])
+    snapshot(root, backups)
+    assert len(list((backups / "objects").glob("*.parquet"))) == 3
+
+
+def test_select_retained():
+    day = datetime(2025, 9, 1)
+    times = [day + timedelta(hours=h) for h in range(0, 24 * 10, 6)]
+    daily = select_retained(times, keep_daily=3, keep_weekly=0)
+    assert sorted(daily) == [day + timedelta(days=d, hours=18) for d in (7, 8, 9)]
+    last = select_retained(times, keep_daily=3, keep_weekly=0, keep_last=4)
+    assert set(sorted(times)[-4:]) <= last
+    assert len(last) == 6
+
+
+def test_restore_without_snapshot_raises(tmp_path):
+    with pytest.raises(ValueError):
+        restore(tmp_path / "backups", tmp_path / "ledger", as_of=START)
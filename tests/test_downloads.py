@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import pytest
+from src.utils import web_utils
+from src.utils.web_utils import download_file, evict_http_cache, stream_download
+
+BODY = bytes(range(256)) * 64
+ETAG = '"v1"'
+
+
+def _partial(dest, url, data: bytes, etag: str = ETAG):
+    dest.with_name(dest.name + ".part").write_bytes(data)
+    dest.with_name(dest.name + ".part.json").write_text(json.dumps({"url": url, "etag": etag}))
+
+
+def test_resume_appends_the_missing_bytes(http_server, static_page, tmp_path):
+    seen = []
+    http_server.pages["/f"] = static_page(seen, BODY, ETAG)
+    url, dest = f"{http_server.url}/f", tmp_path / "f.bin"
+    _partial(dest, url, BODY[:1000])
+
+    checksum = "sha256:" + hashlib.sha256(BODY).hexdigest()
+    assert stream_download(url, dest, checksum=checksum, backoff=0) is not None
+    assert seen[0]["Range"] == "bytes=1000-"
+    assert dest.read_bytes() == BODY
+    assert not dest.with_name("f.bin.part").exists()
+
+
+def test_full_response_to_a_range_request_restarts(http_server, static_page, tmp_path):
+    seen = []
+    http_server.pages["/f"] = static_page(seen, BODY, '"v2"')
+    url, dest = f"{http_server.url}/f", tmp_path / "f.bin"
+    _partial(dest, url, b"stale bytes")
+
+    stream_download(url, dest, backoff=0)
+    assert seen[0]["If-Range"] == ETAG
+    assert dest.read_bytes() == BODY
+
+
+def test_partial_response_without_content_range_is_retried(http_server, static_page, tmp_path):
+    seen = []
+    http_server.pages["/f"] = static_page(seen, BODY, ETAG, content_range=False)
+    url, dest = f"{http_server.url}/f", tmp_path / "f.bin"
+    _partial(dest, url, BODY[:1000])
+
+    stream_download(url, dest, retries=1, backoff=0)
+    assert len(seen) == 2
+    assert "Range" not in seen[1]
+    assert dest.read_bytes() == BODY
+
+
+def test_checksum_mismatch_leaves_nothing_behind(http_server, static_page, tmp_path):
+    http_server.pages["/f"] = static_page([], BODY, ETAG)
+    url, dest = f"{http_server.url}/f", tmp_path / "f.bin"
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        stream_download(url, dest, checksum="sha256:" + "0" * 64, backoff=0)
+    assert not dest.exists()
+    assert not dest.with_name("f.bin.part").exists()
+
+
+def test_download_file_streams_into_dest(http_server, static_page, tmp_path, monkeypatch):
+    monkeypatch.setattr(web_utils, "HTTP_CACHE_DIR", tmp_path / "cache")
+    http_server.pages["/f.csv"] = static_page([], BODY, ETAG)
+    dest = tmp_path / "f.csv"
+    checksum = "sha256:" + hashlib.sha256(BODY).hexdigest()
+
+    assert download_file(f"{http_server.url}/f.csv", dest, checksum=checksum) == dest
+    assert dest.read_bytes() == BODY
+    assert not (tmp_path / "cache").exists()
+
+
+def _cache_body(cache_dir, name, size, mtime):
+    body = cache_dir / f"{name}.body"
+    body.write_bytes(b"x" * size)
+    (cache_dir / f"{name}.json").write_text("{}")
+    os.utime(body, (mtime, mtime))
+    return body
+
+
+def test_oversized_kept_entry_does_not_flush_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_utils, "HTTP_CACHE_DIR", tmp_path)
+    small = [_cache_body(tmp_path, f"s{i}", 10, 1000 + i) for i in range(3)]
+    big = _cache_body(tmp_path, "big", 500, 2000)
+
+    assert evict_http_cache(100, keep=big) == 0
+    assert all(p.exists() for p in small + [big])
+
+
+def test_eviction_drops_oversized_entries_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_utils, "HTTP_CACHE_DIR", tmp_path)
+    old = _cache_body(tmp_path, "old", 10, 1000)
+    big = _cache_body(tmp_path, "big", 500, 2000)
+    new = _cache_body(tmp_path, "new", 10, 3000)
+
+    assert evict_http_cache(100, keep=new) == 1
+    assert old.exists() and new.exists() and not big.exists()
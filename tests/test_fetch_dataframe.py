@@ -0,0 +1,65 @@
+import gzip
+import io
+import zipfile
+import pandas as pd
+import pytest
+from src.utils.web_utils import fetch_dataframe
+
+FRAME = pd.DataFrame({"month": ["JAN", "FEB", "MAR"] * 100, "travellers": range(300)})
+CSV = FRAME.to_csv(index=False).encode()
+
+
+def _zipped(method: int) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=method) as z:
+        z.writestr("data.csv", CSV)
+    return buf.getvalue()
+
+
+PAYLOADS = {
+    "plain": CSV,
+    "gzip": gzip.compress(CSV),
+    "zip": _zipped(zipfile.ZIP_DEFLATED),
+    "stored": _zipped(zipfile.ZIP_STORED),
+}
+
+
+@pytest.mark.parametrize("kind", PAYLOADS)
+def test_payload_is_sniffed_and_parsed(http_server, kind):
+    # No file suffix in the URL: compression comes from the magic bytes
+    http_server.pages["/data"] = (200, {}, PAYLOADS[kind])
+    df = fetch_dataframe(f"{http_server.url}/data")
+    pd.testing.assert_frame_equal(df, FRAME)
+
+
+def test_chunks_and_tee(http_server, tmp_path):
+    http_server.pages["/data"] = (200, {}, PAYLOADS["gzip"])
+    tee = tmp_path / "raw" / "data.csv.gz"
+    chunks = list(fetch_dataframe(f"{http_server.url}/data", chunksize=64, tee=tee))
+    assert [len(c) for c in chunks] == [64, 64, 64, 64, 44]
+    pd.testing.assert_frame_equal(pd.concat(chunks), FRAME)
+    assert tee.read_bytes() == PAYLOADS["gzip"]
+    assert not tee.with_name(tee.name + ".part").exists()
+
+
+def test_partial_read_is_archived_whole(http_server, tmp_path):
+    http_server.pages["/data"] = (200, {}, PAYLOADS["plain"])
+    tee = tmp_path / "data.csv"
+    df = fetch_dataframe(f"{http_server.url}/data", tee=tee, nrows=5)
+    assert len(df) == 5
+    assert tee.read_bytes() == CSV
+
+
+def test_failed_parse_leaves_no_archive(http_server, tmp_path):
+    bad = b"a,b\n1,2\n1,2,3,4\n" + b"5,6\n" * 500_000
+    http_server.pages["/data"] = (200, {}, bad)
+    tee = tmp_path / "data.csv"
+    with pytest.raises(pd.errors.ParserError):
+        fetch_dataframe(f"{http_server.url}/data", tee=tee)
+    assert not tee.exists()
+    assert not tee.with_name("data.csv.part").exists()
+
+
+def test_http_error_is_raised(http_server):
+    with pytest.raises(Exception):
+        fetch_dataframe(f"{http_server.url}/missing")
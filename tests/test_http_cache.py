@@ -0,0 +1,71 @@
+import os
+from src.utils import web_utils
+from src.utils.web_utils import cached_fetch, evict_http_cache, get_soup
+
+PAGE = b"<html><body><table id='t'><tr><th>a</th></tr><tr><td>1</td></tr></table></body></html>"
+ETAG = '"p1"'
+
+
+def _use_cache_dir(monkeypatch, path):
+    monkeypatch.setattr(web_utils, "HTTP_CACHE_DIR", path)
+    return path
+
+
+def test_fresh_entry_is_served_from_disk(http_server, static_page, tmp_path, monkeypatch):
+    _use_cache_dir(monkeypatch, tmp_path)
+    seen = []
+    http_server.pages["/p"] = static_page(seen, PAGE, ETAG)
+    url = f"{http_server.url}/p"
+
+    body, meta = cached_fetch(url, ttl=3600)
+    assert body.read_bytes() == PAGE
+    assert meta["etag"] == ETAG
+    assert cached_fetch(url, ttl=3600)[0] == body
+    assert len(seen) == 1
+
+
+def test_stale_entry_is_revalidated(http_server, static_page, tmp_path, monkeypatch):
+    _use_cache_dir(monkeypatch, tmp_path)
+    seen = []
+    http_server.pages["/p"] = static_page(seen, PAGE, ETAG)
+    url = f"{http_server.url}/p"
+
+    cached_fetch(url, ttl=0)
+    body, _ = cached_fetch(url, ttl=0)
+    assert seen[1]["If-None-Match"] == ETAG
+    assert body.read_bytes() == PAGE
+
+
+def test_changed_page_replaces_the_entry(http_server, static_page, tmp_path, monkeypatch):
+    _use_cache_dir(monkeypatch, tmp_path)
+    url = f"{http_server.url}/p"
+    http_server.pages["/p"] = static_page([], PAGE, ETAG)
+    cached_fetch(url, ttl=0)
+
+    http_server.pages["/p"] = static_page([], PAGE.replace(b"1", b"2"), '"p2"')
+    body, meta = cached_fetch(url, ttl=0)
+    assert b"<td>2</td>" in body.read_bytes()
+    assert meta["etag"] == '"p2"'
+
+
+def test_get_soup_uses_the_cache(http_server, static_page, tmp_path, monkeypatch):
+    _use_cache_dir(monkeypatch, tmp_path)
+    seen = []
+    http_server.pages["/p"] = static_page(seen, PAGE, ETAG)
+    url = f"{http_server.url}/p"
+
+    for _ in range(2):
+        assert get_soup(url, use_cache=True).find("td").get_text() == "1"
+    assert len(seen) == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path, monkeypatch):
+    _use_cache_dir(monkeypatch, tmp_path)
+    for i in range(4):
+        body = tmp_path / f"{i}.body"
+        body.write_bytes(b"x" * 10)
+        (tmp_path / f"{i}.json").write_text("{}")
+        os.utime(body, (1000 + i, 1000 + i))
+
+    assert evict_http_cache(25) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2.body", "2.json", "3.body", "3.json"]
@@ -0,0 +1,89 @@
+import re
+import zipfile
+import pandas as pd
+from openpyxl import Workbook
+from src.utils.io_utils import read_excel, sheet_headers, union_sheets, to_excel_stream
+from src.utils.pipeline_utils import apply_stages, filter_rows
+
+
+def _book(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "a"
+    ws.append(["x", None, "x"])
+    ws.append([1, 2, 3])
+    ws = wb.create_sheet("b")
+    ws.append(["y", "x"])
+    ws.append([7, 8])
+    wb.create_sheet("empty")
+    wb.save(path)
+    return path
+
+
+def test_sheet_headers_match_pandas(tmp_path):
+    path = _book(tmp_path / "book.xlsx")
+    headers = sheet_headers(path)
+    for name, header in headers.items():
+        assert header == list(pd.read_excel(path, sheet_name=name).columns)
+
+
+def test_union_sheets_aligns_columns(tmp_path):
+    path = _book(tmp_path / "book.xlsx")
+    df = pd.concat(union_sheets(path, workers=1))
+    assert list(df.columns) == ["x", "Unnamed: 1", "x.1", "y", "sheet"]
+    assert list(df["x"]) == [1, 8]
+    assert list(df["sheet"]) == ["a", "b"]
+
+
+def _header(path):
+    return list(pd.read_excel(path, nrows=0).columns)
+
+
+def test_to_excel_stream_writes_header_without_rows(tmp_path):
+    empty = pd.DataFrame({"a": [], "b": []})
+    assert to_excel_stream(empty, tmp_path / "frame.xlsx") == 0
+    assert _header(tmp_path / "frame.xlsx") == ["a", "b"]
+
+    assert to_excel_stream(iter([]), tmp_path / "none.xlsx", columns=["a", "b"]) == 0
+    assert _header(tmp_path / "none.xlsx") == ["a", "b"]
+
+
+def test_filtered_out_pipeline_keeps_header(tmp_path):
+    chunks = [pd.DataFrame({"a": [1, 2], "b": [3, 4]}), pd.DataFrame({"a": [5], "b": [6]})]
+    rows = apply_stages(chunks, filter_rows(lambda df: df["a"] > 10))
+    assert to_excel_stream(rows, tmp_path / "out.xlsx") == 0
+    assert _header(tmp_path / "out.xlsx") == ["a", "b"]
+
+
+def test_union_sheets_keeps_cells_past_the_header(tmp_path):
+    path = tmp_path / "wide.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["x", "y"])
+    ws.append([1, 2, 3])
+    wb.save(path)
+
+    df = pd.concat(union_sheets(path, workers=1))
+    assert list(df.columns) == ["x", "y", "Unnamed: 2", "sheet"]
+    assert df["Unnamed: 2"].tolist() == [3]
+
+
+def _stale_dimension(path, ref="A1:B3"):
+    # Rewrites the sheet's <dimension> tag the way a sloppy third-party writer would
+    with zipfile.ZipFile(path) as z:
+        parts = {name: z.read(name) for name in z.namelist()}
+    sheet = "xl/worksheets/sheet1.xml"
+    parts[sheet] = re.sub(rb'<dimension ref="[^"]*"', f'<dimension ref="{ref}"'.encode(), parts[sheet])
+    with zipfile.ZipFile(path, "w") as z:
+        for name, data in parts.items():
+            z.writestr(name, data)
+    return path
+
+
+def test_openpyxl_reader_ignores_stale_dimension(tmp_path):
+    path = tmp_path / "stale.xlsx"
+    pd.DataFrame({"a": range(10), "b": range(10)}).to_excel(path, index=False)
+    _stale_dimension(path)
+    df = read_excel(path, engine="openpyxl")
+    assert len(df) == 10
+    assert df.equals(pd.read_excel(path))
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from src.utils.ledger_utils import index_path, key_hashes, list_partitions, read_ledger, upsert_partitions
+
+KEYS = ["fecha", "producto"]
+
+
+def _day(fecha="2025-09-01", precios=(10, 12), ts="2025-09-01 10:00"):
+    return pd.DataFrame({
+        "fecha": pd.to_datetime([fecha] * len(precios)),
+        "producto": ["A", "B"][:len(precios)],
+        "precio": list(precios),
+        "ingestion_ts": pd.Timestamp(ts),
+    })
+
+
+@pytest.mark.parametrize("unit", ["s", "ms", "us", "ns"])
+def test_key_hashes_ignore_datetime_unit(unit):
+    df = _day()
+    other = df.assign(fecha=df["fecha"].astype(f"datetime64[{unit}]"), producto=df["producto"].astype("category"))
+    assert (key_hashes(other, KEYS) == key_hashes(df, KEYS)).all()
+
+
+def test_upsert_counts_and_keeps_one_row_per_key(tmp_path):
+    assert upsert_partitions(tmp_path, _day(), KEYS, "ingestion_ts") == \
+        {"inserted": 2, "updated": 0, "unchanged": 0, "rows": 2}
+    again = _day(precios=(10, 15), ts="2025-09-02 10:00")
+    assert upsert_partitions(tmp_path, again, KEYS, "ingestion_ts") == \
+        {"inserted": 0, "updated": 1, "unchanged": 1, "rows": 2}
+    ledger = read_ledger(tmp_path, sort_by=KEYS)
+    assert ledger["precio"].tolist() == [10, 15]
+
+
+def test_keys_at_another_resolution_are_not_duplicated(tmp_path):
+    upsert_partitions(tmp_path, _day(), KEYS, "ingestion_ts")
+    coarse = _day(precios=(10, 12)).assign(fecha=lambda d: d["fecha"].astype("datetime64[s]"))
+    stats = upsert_partitions(tmp_path, coarse, KEYS, "ingestion_ts")
+    assert stats["unchanged"] == 2 and stats["rows"] == 2
+
+
+def test_mismatched_index_is_rebuilt(tmp_path):
+    upsert_partitions(tmp_path, _day(), KEYS, "ingestion_ts")
+    [part] = list_partitions(tmp_path)
+    pd.DataFrame({"key_hash": pd.array([1, 2], dtype="uint64")}).to_parquet(index_path(tmp_path, part))
+
+    stats = upsert_partitions(tmp_path, _day(), KEYS, "ingestion_ts")
+    assert stats == {"inserted": 0, "updated": 0, "unchanged": 2, "rows": 2}
+    assert (pd.read_parquet(index_path(tmp_path, part))["key_hash"].to_numpy() == key_hashes(_day(), KEYS)).all()
+
+
+def test_deleted_partition_drops_its_index(tmp_path):
+    upsert_partitions(tmp_path, _day(), KEYS, "ingestion_ts")
+    [part] = list_partitions(tmp_path)
+    part.unlink()
+
+    stats = upsert_partitions(tmp_path, _day(precios=(10,)), KEYS, "ingestion_ts")
+    assert stats["inserted"] == 1
+    assert len(read_ledger(tmp_path)) == 1
+    assert len(pd.read_parquet(index_path(tmp_path, part))) == 1
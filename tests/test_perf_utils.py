@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+import tracemalloc
+import numpy as np
+from src.utils import perf_utils
+from src.utils.perf_utils import map_settled, measure, summarize, timed
+
+
+def _records(monkeypatch):
+    records = []
+    monkeypatch.setattr(perf_utils, "emit", records.append)
+    return records
+
+
+def test_memory_is_reported_per_call(monkeypatch):
+    records = _records(monkeypatch)
+    with measure("big"):
+        big = np.ones(64 * 1024 * 1024 // 8)
+    with measure("small"):
+        small = np.ones(1024)
+    assert records[0]["rss_delta_mb"] > 40
+    assert abs(records[1]["rss_delta_mb"]) < 10
+    del big, small
+
+
+def test_tracemalloc_peak_is_reset_per_call(monkeypatch):
+    records = _records(monkeypatch)
+    tracemalloc.start()
+    try:
+        with measure("big"):
+            np.ones(16 * 1024 * 1024 // 8)
+        with measure("small"):
+            np.ones(1024)
+    finally:
+        tracemalloc.stop()
+    assert records[0]["peak_alloc_mb"] >= 16
+    assert records[1]["peak_alloc_mb"] < 1
+
+
+def test_timed_records_rows_and_errors(monkeypatch):
+    records = _records(monkeypatch)
+
+    @timed("frame")
+    def frame(n):
+        import pandas as pd
+        return pd.DataFrame({"a": range(n)})
+
+    @timed("fails")
+    def fails():
+        raise RuntimeError("boom")
+
+    frame(5)
+    try:
+        fails()
+    except RuntimeError:
+        pass
+    assert records[0]["rows"] == 5 and records[0]["status"] == "ok"
+    assert records[1]["status"] == "error"
+    [fails_row] = [r for r in summarize(records) if r["name"] == "fails"]
+    assert fails_row["errors"] == 1
+
+
+def _invert(x):
+    return 1 / x
+
+
+def test_map_settled_keeps_order_and_exceptions():
+    inline = map_settled(_invert, [1, 0, 4])
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        pooled = map_settled(lambda job: _invert(job[0]), [(1, "a"), (0, "b"), (4, "c")], ex,
+                             key=lambda job: job[1])
+    assert [k for k, _ in inline] == [1, 0, 4]
+    assert inline[0][1] == 1 and inline[2][1] == 0.25
+    assert isinstance(inline[1][1], ZeroDivisionError)
+    assert [k for k, _ in pooled] == ["a", "b", "c"]
+    assert pooled[0][1] == 1 and pooled[2][1] == 0.25
+    assert isinstance(pooled[1][1], ZeroDivisionError)
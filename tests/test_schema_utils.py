@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+from src.utils import schema_utils
+from src.utils.schema_utils import SALES_EN, get_plan, normalize
+
+
+@pytest.fixture(autouse=True)
+def fresh_plans(monkeypatch):
+    monkeypatch.setattr(schema_utils, "_PLANS", {})
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    calls = []
+    detect = schema_utils.detect_date_format
+
+    def counting(values, formats, *args):
+        calls.append(len(values))
+        return detect(values, formats, *args)
+
+    monkeypatch.setattr(schema_utils, "detect_date_format", counting)
+    return calls
+
+
+def _sales(dates):
+    return pd.DataFrame({"Fecha": dates, "Producto": [" a "] * len(dates), "Precio": 1, "Qty": 2})
+
+
+def test_aliases_and_labels():
+    df = normalize(_sales(["2025-09-01"]), SALES_EN)
+    assert list(df.columns) == ["date", "product", "price", "sold_units"]
+    assert df["product"].tolist() == ["A"]
+
+
+def test_missing_required_column():
+    with pytest.raises(ValueError, match="sold_units"):
+        normalize(_sales(["2025-09-01"]).drop(columns="Qty"), SALES_EN)
+
+
+def test_repeat_layout_reuses_the_date_format(detections):
+    normalize(_sales(["2025-09-01", "2025-09-02"]), SALES_EN)
+    df = normalize(_sales(["2025-10-01", "2025-10-02"]), SALES_EN)
+    assert len(detections) == 1
+    assert df["date"].tolist() == [pd.Timestamp("2025-10-01"), pd.Timestamp("2025-10-02")]
+    assert get_plan(list(_sales([]).columns), SALES_EN).date_formats == {"date": "%Y-%m-%d"}
+
+
+def test_changed_date_layout_is_detected_again(detections):
+    normalize(_sales(["2025-09-01"]), SALES_EN)
+    df = normalize(_sales(["25/09/2025", "26/09/2025"]), SALES_EN)
+    assert len(detections) == 2
+    assert df["date"].tolist() == [pd.Timestamp("2025-09-25"), pd.Timestamp("2025-09-26")]
+
+
+def test_mixed_dates_fall_back_to_mixed_parsing():
+    df = normalize(_sales(["2025-09-01", "2025-09-02 10:30:00"]), SALES_EN)
+    assert df["date"].tolist() == [pd.Timestamp("2025-09-01"), pd.Timestamp("2025-09-02 10:30")]
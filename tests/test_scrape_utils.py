@@ -0,0 +1,52 @@
+import threading
+from src.utils.scrape_utils import scrape_many
+
+TABLE = b"""<html><body><table id="t">
+<tr><th>name</th><th>value</th></tr>
+<tr><td>a</td><td>1</td></tr><tr><td>b</td><td>2</td></tr>
+</table></body></html>"""
+HTML = {"Content-Type": "text/html"}
+
+
+def test_scrape_reads_local_pages(http_server):
+    http_server.pages = {"/one": (200, HTML, TABLE), "/two": (200, HTML, TABLE)}
+    urls = [f"{http_server.url}/one", f"{http_server.url}/two"]
+    results = scrape_many(urls, table_id="t", parse_workers=0, use_cache=False)
+    assert [r[0] for r in results] == urls
+    assert all(source == "web" and len(df) == 2 for _, df, source in results)
+
+
+def test_missing_page_uses_fallback(http_server):
+    url = f"{http_server.url}/missing"
+    [(_, df, source)] = scrape_many([url], table_id="t", fallback_html=TABLE.decode(),
+                                    parse_workers=0, use_cache=False)
+    assert source == "fallback"
+    assert list(df["name"]) == ["a", "b"]
+
+
+def test_missing_page_without_fallback_is_reported(http_server):
+    [(_, error, source)] = scrape_many([f"{http_server.url}/missing"], table_id="t",
+                                       parse_workers=0, use_cache=False)
+    assert isinstance(error, Exception)
+    assert source is None
+
+
+def test_sync_sink_runs_off_the_event_loop(http_server):
+    http_server.pages = {"/one": (200, HTML, TABLE)}
+    seen = []
+    scrape_many([f"{http_server.url}/one"], table_id="t", parse_workers=0, use_cache=False,
+                sink=lambda url, df: seen.append((threading.current_thread(), len(df))))
+    assert len(seen) == 1
+    assert seen[0][0] is not threading.main_thread()
+    assert seen[0][1] == 2
+
+
+def test_async_sink_is_awaited(http_server):
+    http_server.pages = {"/one": (200, HTML, TABLE)}
+    seen = []
+
+    async def sink(url, df):
+        seen.append(len(df))
+
+    scrape_many([f"{http_server.url}/one"], table_id="t", parse_workers=0, use_cache=False, sink=sink)
+    assert seen == [2]
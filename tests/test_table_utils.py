@@ -0,0 +1,39 @@
+import pytest
+from src.utils.table_utils import extract_table, extract_tables
+
+NESTED = """<table id="outer">
+<tr><th>name</th><th>detail</th></tr>
+<tr><td>a</td><td><table id="inner"><tr><th>k</th><th>v</th></tr><tr><td>x</td><td>y</td></tr></table></td></tr>
+<tr><td>b</td><td>plain</td></tr>
+</table>"""
+
+SPANS = """<table id="t">
+<thead><tr><th rowspan="2">id</th><th colspan="2">price</th></tr>
+<tr><th>min</th><th>max</th></tr></thead>
+<tbody><tr><td>1</td><td>007</td><td></td></tr><tr><td>2</td><td colspan="2">5</td></tr></tbody>
+</table>"""
+
+
+@pytest.mark.parametrize("engine", ["stream", "bs4"])
+def test_spans_and_multirow_header(engine):
+    df = extract_table(SPANS, table_id="t", engine=engine)
+    assert list(df.columns) == ["id", "price min", "price max"]
+    assert df.values.tolist() == [["1", "007", ""], ["2", "5", "5"]]
+
+
+def test_nested_table_keeps_outer_rows():
+    outer, inner = extract_tables(NESTED, engine="stream")
+    assert list(outer.columns) == ["name", "detail"]
+    assert outer["name"].tolist() == ["a", "b"]
+    assert outer["detail"].tolist()[1] == "plain"
+    assert inner.values.tolist() == [["x", "y"]]
+
+
+def test_select_by_id():
+    inner = extract_table(NESTED, table_id="inner", engine="stream")
+    assert inner.values.tolist() == [["x", "y"]]
+
+
+def test_unclosed_table_keeps_rows_read():
+    df = extract_table("<table><tr><th>a</th></tr><tr><td>1</td>", engine="stream")
+    assert df["a"].tolist() == ["1"]
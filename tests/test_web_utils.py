@@ -0,0 +1,35 @@
+from src.utils.web_utils import ValidatorStore, _conditional_headers, download_many, fetch_to_file
+
+BODY = bytes(range(256)) * 64
+ETAG = '"v1"'
+
+
+def test_not_modified_keeps_the_file(http_server, static_page, tmp_path):
+    seen = []
+    http_server.pages["/f"] = static_page(seen, BODY, ETAG)
+    url, dest = f"{http_server.url}/f", tmp_path / "f.bin"
+    store = ValidatorStore(tmp_path / "validators.json")
+
+    assert fetch_to_file(url, dest, validators=store) == dest
+    store.save()
+    store = ValidatorStore(tmp_path / "validators.json")
+    assert _conditional_headers(store.get(url)) == {"If-None-Match": ETAG}
+    assert fetch_to_file(url, dest, validators=store) is None
+    assert seen[-1]["If-None-Match"] == ETAG
+    assert dest.read_bytes() == BODY
+
+
+def test_no_conditional_headers_without_the_file(tmp_path):
+    assert _conditional_headers({"etag": ETAG, "path": str(tmp_path / "gone.bin")}) == {}
+
+
+def test_download_many_keeps_job_order(http_server, static_page, tmp_path):
+    http_server.pages = {f"/{i}": static_page([], bytes([i]) * 100, f'"{i}"') for i in range(6)}
+    jobs = [(f"{http_server.url}/{i}", tmp_path / f"{i}.bin") for i in range(6)]
+    jobs.append((f"{http_server.url}/missing", tmp_path / "missing.bin"))
+
+    results = download_many(jobs, workers=3, per_host=2, retries=0)
+    assert [url for url, _ in results] == [url for url, _ in jobs]
+    for i, (_, result) in enumerate(results[:6]):
+        assert result.read_bytes() == bytes([i]) * 100
+    assert isinstance(results[-1][1], Exception)